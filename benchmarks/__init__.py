@@ -0,0 +1,11 @@
+"""
+benchmarks
+
+Owns:
+- Offline latency and throughput benchmarks of the serving path
+- JSON baselines and the regression comparison between two runs
+
+Does NOT:
+- Run as part of the API
+- Ship baseline numbers (they are recorded per machine with --save-baseline)
+"""
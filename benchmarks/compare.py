@@ -0,0 +1,83 @@
+"""
+compare.py
+
+Owns:
+- Comparing a benchmark run against a baseline and flagging regressions
+
+Does NOT:
+- Run benchmarks (see run.py)
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from benchmarks.harness import BASELINE_PATH, load_results
+
+# relative change beyond which a benchmark counts as regressed
+DEFAULT_THRESHOLD = 0.10
+
+# metrics where higher is worse, and where lower is worse
+LATENCY_METRICS = ("p50_us", "p95_us")
+THROUGHPUT_METRICS = ("ops_per_sec",)
+
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> list[dict]:
+    """
+    One row per benchmark and metric present in both runs, with its relative
+    change (positive is worse) and whether it exceeds the threshold.
+    """
+    rows = []
+    for name, base in baseline["results"].items():
+        result = current["results"].get(name)
+        if result is None:
+            continue
+
+        for metric in LATENCY_METRICS + THROUGHPUT_METRICS:
+            old, new = base.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if metric in THROUGHPUT_METRICS:
+                change = -change
+            rows.append({
+                "benchmark": name,
+                "metric": metric,
+                "baseline": old,
+                "current": new,
+                "change": change,
+                "regressed": change > threshold,
+            })
+    return rows
+
+
+def print_report(rows: list[dict], threshold: float) -> None:
+    print(f"{'benchmark':<48} {'metric':<12} {'baseline':>12} {'current':>12} {'change':>8}")
+    for row in rows:
+        flag = "  REGRESSED" if row["regressed"] else ""
+        print(
+            f"{row['benchmark']:<48} {row['metric']:<12} {row['baseline']:>12.1f} "
+            f"{row['current']:>12.1f} {row['change']:>+8.1%}{flag}"
+        )
+
+    regressions = sum(row["regressed"] for row in rows)
+    print(f"\n{regressions} regression(s) beyond {threshold:.0%} (positive change is worse).")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare benchmark results against a baseline, exiting 1 on regressions."
+    )
+    parser.add_argument("results", type=Path)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    rows = compare(load_results(args.baseline), load_results(args.results), args.threshold)
+    print_report(rows, args.threshold)
+    if any(row["regressed"] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
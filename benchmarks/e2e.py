@@ -0,0 +1,112 @@
+"""
+e2e.py
+
+Owns:
+- End-to-end benchmarks of the API through an in-process ASGI load generator
+- Latency percentiles per endpoint and concurrency level, and the max RPS
+
+Does NOT:
+- Open sockets or start uvicorn (requests go straight into the ASGI app)
+- Touch the API database (a temporary database is used)
+"""
+
+import asyncio
+import os
+import time
+from pathlib import Path
+
+from benchmarks.harness import load_corpus, load_v1_corpus, summarize
+
+# concurrent clients per single-prediction scenario
+CONCURRENCY_LEVELS = (1, 16, 64)
+
+# rows per request and concurrent clients of the batch scenario
+BATCH_ROWS = 256
+BATCH_CONCURRENCY = 4
+
+
+async def _drive(client, path: str, payloads: list, concurrency: int, num_requests: int) -> dict:
+    # num_requests spread over concurrency clients, each sending back to back
+    latencies = []
+    errors = 0
+    next_request = iter(range(num_requests))
+
+    async def client_loop():
+        nonlocal errors
+        for i in next_request:
+            start = time.perf_counter_ns()
+            response = await client.post(path, json=payloads[i % len(payloads)])
+            latencies.append(time.perf_counter_ns() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    result = summarize(latencies)
+    # with concurrent clients throughput is requests over wall time, not over summed latency
+    result["ops_per_sec"] = round(num_requests / elapsed, 1)
+    result["rows_per_sec"] = None
+    result["concurrency"] = concurrency
+    result["errors"] = errors
+    return result
+
+
+async def _run(num_requests: int, corpus_limit: int) -> dict:
+    import httpx
+
+    from src.api.main import app
+
+    v1_payloads = load_v1_corpus(limit=corpus_limit)
+    v2_payloads = load_corpus(limit=corpus_limit)
+    batch_payloads = [
+        v2_payloads[i:i + BATCH_ROWS]
+        for i in range(0, len(v2_payloads) - BATCH_ROWS + 1, BATCH_ROWS)
+    ] or [v2_payloads]
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            # let the background warm-up finish before measuring
+            await client.post("/predict", json=v1_payloads[0])
+
+            for path, payloads in (("/predict", v1_payloads), ("/v2/predict", v2_payloads)):
+                max_rps = 0.0
+                for concurrency in CONCURRENCY_LEVELS:
+                    result = await _drive(client, path, payloads, concurrency, num_requests)
+                    results[f"e2e {path} c={concurrency}"] = result
+                    max_rps = max(max_rps, result["ops_per_sec"])
+                results[f"e2e {path} max_rps"] = {"ops_per_sec": max_rps}
+
+            result = await _drive(
+                client, "/v2/predict/batch", batch_payloads,
+                BATCH_CONCURRENCY, max(num_requests // 20, 20),
+            )
+            result["rows_per_call"] = BATCH_ROWS
+            result["rows_per_sec"] = round(result["ops_per_sec"] * BATCH_ROWS, 1)
+            results[f"e2e /v2/predict/batch[{BATCH_ROWS}] c={BATCH_CONCURRENCY}"] = result
+
+    return results
+
+
+def configure_environment(tmp_dir: Path, use_cache: bool = False) -> None:
+    """
+    Point the API at a temporary database and turn off the model watcher.
+    The prediction cache is off unless use_cache, since the corpus repeats
+    and hits would hide the scoring cost.
+
+    Settings are read when src.api modules are imported, so this must run first.
+    """
+    os.environ["CHURN_DB_PATH"] = str(Path(tmp_dir) / "bench.db")
+    os.environ["CHURN_MODEL_WATCH_INTERVAL_S"] = "0"
+    if not use_cache:
+        os.environ["CHURN_CACHE_SIZE"] = "0"
+
+
+def run_e2e(num_requests: int = 2000, corpus_limit: int = 2048) -> dict:
+    """
+    Benchmark the API end to end, after configure_environment().
+    """
+    return asyncio.run(_run(num_requests, corpus_limit))
@@ -0,0 +1,132 @@
+"""
+harness.py
+
+Owns:
+- Timing a callable and summarizing it as latency percentiles and throughput
+- Building request corpora from data/processed/telco_churn_clean.csv
+- Reading and writing benchmark result files
+
+Does NOT:
+- Decide what is benchmarked (see stages.py and e2e.py)
+"""
+
+import json
+import platform
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+# Resolve project root safely (…/benchmarks/harness.py → project root)
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+CORPUS_PATH = PROJECT_ROOT / "data" / "processed" / "telco_churn_clean.csv"
+BASELINE_PATH = PROJECT_ROOT / "benchmarks" / "baselines" / "baseline.json"
+
+
+def summarize(samples_ns: list[int], rows_per_call: int = 1) -> dict:
+    """
+    Latency percentiles in microseconds plus throughput of a series of calls.
+    """
+    samples_us = np.asarray(samples_ns, dtype=np.float64) / 1000
+    p50, p95, p99 = np.percentile(samples_us, [50, 95, 99])
+    total_s = samples_us.sum() / 1e6
+
+    return {
+        "calls": len(samples_us),
+        "rows_per_call": rows_per_call,
+        "p50_us": round(float(p50), 3),
+        "p95_us": round(float(p95), 3),
+        "p99_us": round(float(p99), 3),
+        "mean_us": round(float(samples_us.mean()), 3),
+        "ops_per_sec": round(len(samples_us) / total_s, 1) if total_s else None,
+        "rows_per_sec": round(len(samples_us) * rows_per_call / total_s, 1) if total_s else None,
+    }
+
+
+def measure(
+    fn: Callable[[int], object],
+    iterations: int,
+    warmup: int = 50,
+    rows_per_call: int = 1,
+) -> dict:
+    """
+    Time fn(i) for i in range(iterations) after a warm-up, one sample per call.
+    fn gets the iteration number so it can cycle through a corpus.
+    """
+    for i in range(warmup):
+        fn(i)
+
+    samples = [0] * iterations
+    for i in range(iterations):
+        start = time.perf_counter_ns()
+        fn(i)
+        samples[i] = time.perf_counter_ns() - start
+
+    return summarize(samples, rows_per_call)
+
+
+def load_corpus(path: Path = CORPUS_PATH, limit: Optional[int] = None) -> list[dict]:
+    """
+    Raw customer records as sent to /v2/predict, without the Churn label.
+    """
+    df = pd.read_csv(path).drop(columns=["Churn"])
+    if limit is not None:
+        df = df.head(limit)
+    return df.to_dict("records")
+
+
+def load_v1_corpus(path: Path = CORPUS_PATH, limit: Optional[int] = None) -> list[dict]:
+    """
+    Model-ready records as sent to /predict, keyed by ChurnInput field names.
+    """
+    from src.api.schema import ChurnInput
+    from src.ml.features import FEATURE_FIELDS
+    from src.ml.inference import load_parity_matrix
+
+    X = load_parity_matrix(path)
+    if limit is not None:
+        X = X[:limit]
+
+    float_fields = {
+        name for name, field in ChurnInput.model_fields.items() if field.annotation is float
+    }
+    return [
+        {
+            field: float(value) if field in float_fields else int(value)
+            for field, value in zip(FEATURE_FIELDS, row)
+        }
+        for row in X.tolist()
+    ]
+
+
+def environment() -> dict:
+    # recorded with every run, results are only comparable on the same machine
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or None,
+        "numpy": np.__version__,
+    }
+
+
+def save_results(path: Path, results: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2) + "\n")
+
+
+def load_results(path: Path) -> dict:
+    return json.loads(Path(path).read_text())
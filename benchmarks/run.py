@@ -0,0 +1,96 @@
+"""
+run.py
+
+Owns:
+- The benchmark CLI: running the stage and end-to-end suites, writing the
+  results, recording a baseline or comparing against it
+
+Does NOT:
+- Measure anything itself (see stages.py and e2e.py)
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.compare import DEFAULT_THRESHOLD, compare, print_report
+from benchmarks.e2e import configure_environment
+from benchmarks.harness import BASELINE_PATH, environment, load_results, save_results
+
+SUITES = ("stages", "e2e", "all")
+
+
+def print_results(results: dict) -> None:
+    print(f"{'benchmark':<48} {'p50_us':>10} {'p95_us':>10} {'p99_us':>10} {'ops/s':>10} {'rows/s':>11}")
+    for name, result in results.items():
+        cells = [result.get(key) for key in ("p50_us", "p95_us", "p99_us", "ops_per_sec", "rows_per_sec")]
+        print(f"{name:<48} " + " ".join(
+            f"{cell:>10.1f}" if cell is not None else f"{'-':>10}" for cell in cells
+        ))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the serving path offline on data/processed/telco_churn_clean.csv."
+    )
+    parser.add_argument("--suite", choices=SUITES, default="all")
+    parser.add_argument("--iterations", type=int, default=2000, help="Calls per stage benchmark.")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per e2e scenario.")
+    parser.add_argument("--cache", action="store_true", help="Keep the prediction cache on in e2e runs.")
+    parser.add_argument("-o", "--output", type=Path, help="Write the results as JSON.")
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Record the results as the baseline (benchmarks/baselines/baseline.json by default).",
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--compare", action="store_true", help="Compare against the baseline, exiting 1 on regressions.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # settings are read when the app is imported, so they are set before any src.api import
+        configure_environment(Path(tmp), use_cache=args.cache)
+        from src.api.logging_config import log_sink
+
+        results = {}
+        # the app logs as it would in production, but not onto the report
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            if args.suite in ("stages", "all"):
+                from benchmarks.stages import run_stages
+                results.update(run_stages(args.iterations))
+            if args.suite in ("e2e", "all"):
+                from benchmarks.e2e import run_e2e
+                results.update(run_e2e(args.requests))
+            log_sink.flush()
+
+    report = {
+        "environment": environment(),
+        "settings": {
+            "suite": args.suite,
+            "iterations": args.iterations,
+            "requests": args.requests,
+            "cache": args.cache,
+        },
+        "results": results,
+    }
+    print_results(results)
+
+    if args.output:
+        save_results(args.output, report)
+    if args.save_baseline:
+        save_results(args.baseline, report)
+        print(f"\nBaseline written to {args.baseline}")
+    if args.compare:
+        print()
+        rows = compare(load_results(args.baseline), report, args.threshold)
+        print_report(rows, args.threshold)
+        if any(row["regressed"] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
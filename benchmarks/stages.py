@@ -0,0 +1,100 @@
+"""
+stages.py
+
+Owns:
+- Benchmarks of each serving stage in isolation: mapping, encoding,
+  validation, scoring and persistence
+
+Does NOT:
+- Go through HTTP (see e2e.py)
+- Persist into the API database (a temporary database is used)
+"""
+
+import tempfile
+from pathlib import Path
+
+from benchmarks.harness import load_corpus, load_v1_corpus, measure
+from src.api.persistence import PredictionStore
+from src.api.schema import ChurnInput, ChurnInputV2
+from src.api.validators import find_exclusivity_violations, validate_mutual_exclusivity
+from src.ml.features import encode_churn_inputs, encode_churn_inputs_v2, map_churn_input_to_df
+from src.ml.load_model import ModelRegistry
+
+# rows per call of the batched stages, the micro-batcher's default batch size
+BATCH_ROWS = 256
+
+# rows per call of the batched persistence stage, the writer's default flush size
+PERSIST_BATCH_ROWS = 500
+
+
+def _batches(items: list, size: int) -> list[list]:
+    return [items[i:i + size] for i in range(0, len(items) - size + 1, size)] or [items]
+
+
+def run_stages(iterations: int = 2000, corpus_limit: int = 2048) -> dict:
+    """
+    Benchmark every stage; batched stages run iterations // 10 calls.
+    """
+    v1_inputs = [ChurnInput(**record) for record in load_v1_corpus(limit=corpus_limit)]
+    v2_inputs = [ChurnInputV2(**record) for record in load_corpus(limit=corpus_limit)]
+    v1_batches = _batches(v1_inputs, BATCH_ROWS)
+    v2_batches = _batches(v2_inputs, BATCH_ROWS)
+
+    X = encode_churn_inputs(v1_inputs)
+    X_batches = [encode_churn_inputs(batch) for batch in v1_batches]
+    engine = ModelRegistry().load().engine
+
+    batch_iterations = max(iterations // 10, 20)
+    n = len(v1_inputs)
+    results = {}
+
+    results["map_churn_input_to_df"] = measure(
+        lambda i: map_churn_input_to_df(v1_inputs[i % n]), iterations
+    )
+    results["encode_churn_inputs[1]"] = measure(
+        lambda i: encode_churn_inputs(v1_inputs[i % n]), iterations
+    )
+    results[f"encode_churn_inputs[{BATCH_ROWS}]"] = measure(
+        lambda i: encode_churn_inputs(v1_batches[i % len(v1_batches)]),
+        batch_iterations, rows_per_call=BATCH_ROWS,
+    )
+    results["encode_churn_inputs_v2[1]"] = measure(
+        lambda i: encode_churn_inputs_v2(v2_inputs[i % len(v2_inputs)]), iterations
+    )
+    results[f"encode_churn_inputs_v2[{BATCH_ROWS}]"] = measure(
+        lambda i: encode_churn_inputs_v2(v2_batches[i % len(v2_batches)]),
+        batch_iterations, rows_per_call=BATCH_ROWS,
+    )
+    results["validate_mutual_exclusivity"] = measure(
+        lambda i: validate_mutual_exclusivity(v1_inputs[i % n]), iterations
+    )
+    results[f"find_exclusivity_violations[{BATCH_ROWS}]"] = measure(
+        lambda i: find_exclusivity_violations(X_batches[i % len(X_batches)]),
+        batch_iterations, rows_per_call=BATCH_ROWS,
+    )
+    results["engine.predict[1]"] = measure(
+        lambda i: engine.predict(X[i % n:i % n + 1]), iterations
+    )
+    results[f"engine.predict[{BATCH_ROWS}]"] = measure(
+        lambda i: engine.predict(X_batches[i % len(X_batches)]),
+        batch_iterations, rows_per_call=BATCH_ROWS,
+    )
+    results["sklearn.predict_proba[1]"] = measure(
+        lambda i: engine.model.predict_proba(X[i % n:i % n + 1]), iterations
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PredictionStore(Path(tmp) / "bench.db")
+        rows = [("bench", 0.5, 1, f"bench-{i}") for i in range(PERSIST_BATCH_ROWS)]
+
+        results["PredictionStore.save_prediction"] = measure(
+            lambda i: store.save_prediction("bench", 0.5, 1, f"bench-{i}"),
+            batch_iterations,
+        )
+        results[f"PredictionStore.save_predictions[{PERSIST_BATCH_ROWS}]"] = measure(
+            lambda i: store.save_predictions(rows),
+            batch_iterations, warmup=5, rows_per_call=PERSIST_BATCH_ROWS,
+        )
+        store.close()
+
+    return results
@@ -0,0 +1,192 @@
+"""
+batching.py
+
+Owns:
+- Dynamic micro-batching of concurrent single-row predictions
+- Batch size statistics
+
+Does NOT:
+- Know about FastAPI or HTTP status codes
+- Validate, encode or score inputs itself (delegated to the process function)
+"""
+
+import asyncio
+import os
+from bisect import bisect_left
+from typing import Any, Callable, Optional
+
+from src.api.executor import InferenceExecutor, Overloaded
+from src.api.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# scheduler settings, overridable through the environment
+MAX_BATCH_SIZE = int(os.getenv("CHURN_MICROBATCH_MAX_SIZE", "256"))
+MAX_WAIT_MS = float(os.getenv("CHURN_MICROBATCH_MAX_WAIT_MS", "2"))
+MAX_PENDING = int(os.getenv("CHURN_MICROBATCH_MAX_PENDING", "4096"))
+
+# upper bounds of the batch size histogram buckets
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+class MicroBatcher:
+    """
+    Merges concurrent single-item requests into one call of process_fn.
+
+    A batch is dispatched as soon as max_batch_size items are pending, or
+    max_wait_ms after the first item of the batch arrived. process_fn runs on
+    the inference executor with the list of items and must return one outcome
+    per item, in order; an outcome that is an Exception is raised to that
+    item's caller only.
+
+    All state is touched from the event loop thread only, so no locks are needed.
+    """
+
+    def __init__(
+        self,
+        process_fn: Callable[[list], list],
+        executor: InferenceExecutor,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_wait_ms: float = MAX_WAIT_MS,
+        max_pending: int = MAX_PENDING,
+    ):
+        self.process_fn = process_fn
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000
+        self.max_pending = max_pending
+
+        self._pending: list[tuple[Any, asyncio.Future]] = []
+        self._has_items: Optional[asyncio.Event] = None
+        self._is_full: Optional[asyncio.Event] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._dispatches: set[asyncio.Task] = set()
+
+        self._bucket_counts = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self._batches = 0
+        self._items = 0
+
+    async def start(self) -> None:
+        """
+        Start the scheduling loop on the running event loop.
+        """
+        if self._runner is not None:
+            return
+
+        self._has_items = asyncio.Event()
+        self._is_full = asyncio.Event()
+        self._runner = asyncio.create_task(self._run())
+        logger.info(
+            "micro_batcher_started",
+            max_batch_size=self.max_batch_size,
+            max_wait_ms=self.max_wait_s * 1000,
+        )
+
+    async def stop(self) -> None:
+        """
+        Dispatch everything still pending and stop the scheduling loop.
+        """
+        if self._runner is None:
+            return
+
+        self._runner.cancel()
+        try:
+            await self._runner
+        except asyncio.CancelledError:
+            pass
+        self._runner = None
+
+        while self._pending:
+            self._dispatch_next()
+        if self._dispatches:
+            await asyncio.gather(*self._dispatches, return_exceptions=True)
+
+        logger.info("micro_batcher_stopped", **self.metrics())
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queue one item and wait for its outcome.
+        """
+        if self._runner is None:
+            await self.start()
+
+        if len(self._pending) >= self.max_pending:
+            raise Overloaded(f"{len(self._pending)} items already pending")
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        self._has_items.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._is_full.set()
+
+        return await future
+
+    def metrics(self) -> dict:
+        """
+        Snapshot of the batch size histogram and counters.
+        """
+        cumulative = 0
+        histogram = {}
+        for bound, count in zip(BATCH_SIZE_BUCKETS + ("+Inf",), self._bucket_counts):
+            cumulative += count
+            histogram[str(bound)] = cumulative
+
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_s * 1000,
+            "pending": len(self._pending),
+            "batches": self._batches,
+            "items": self._items,
+            "mean_batch_size": self._items / self._batches if self._batches else 0.0,
+            "batch_size_histogram": histogram,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            await self._has_items.wait()
+
+            # give concurrent requests up to max_wait to join, unless the batch fills first
+            try:
+                await asyncio.wait_for(self._is_full.wait(), timeout=self.max_wait_s)
+            except asyncio.TimeoutError:
+                pass
+
+            self._dispatch_next()
+
+    def _dispatch_next(self) -> None:
+        batch = self._pending[:self.max_batch_size]
+        self._pending = self._pending[self.max_batch_size:]
+
+        if not self._pending:
+            self._has_items.clear()
+        if len(self._pending) < self.max_batch_size:
+            self._is_full.clear()
+
+        if not batch:
+            return
+
+        self._batches += 1
+        self._items += len(batch)
+        self._bucket_counts[bisect_left(BATCH_SIZE_BUCKETS, len(batch))] += 1
+
+        # scoring runs concurrently with collecting the next batch
+        task = asyncio.create_task(self._process(batch))
+        self._dispatches.add(task)
+        task.add_done_callback(self._dispatches.discard)
+
+    async def _process(self, batch: list) -> None:
+        items = [item for item, _ in batch]
+
+        try:
+            outcomes = await self.executor.run(self.process_fn, items)
+        except Exception as e:
+            outcomes = [e] * len(batch)
+
+        for (_, future), outcome in zip(batch, outcomes):
+            # callers that gave up on their deadline have already cancelled
+            if future.done():
+                continue
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
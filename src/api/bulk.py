@@ -0,0 +1,228 @@
+"""
+bulk.py
+
+Owns:
+- Parsing NDJSON or CSV customer exports line by line
+- Scoring them in fixed-size chunks through the vectorized model path
+- The offline bulk scoring CLI
+
+Does NOT:
+- Know about FastAPI or HTTP status codes
+- Persist predictions (bulk exports are scored, not logged per row)
+- Define the feature contract (delegated to features.py)
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from pydantic import ValidationError as SchemaValidationError
+
+from src.api.logging_config import get_logger
+from src.api.schema import ChurnInputV2
+from src.api.scoring import score_inputs_v2
+from src.api.validators import schema_error_message
+from src.ml.preprocessing import MISSING_TOTAL_CHARGES_ERROR, is_missing_total_charges
+
+logger = get_logger(__name__)
+
+BULK_FORMATS = ("ndjson", "csv")
+
+# rows scored per model call, overridable through the environment
+BULK_CHUNK_SIZE = int(os.getenv("CHURN_BULK_CHUNK_SIZE", "5000"))
+MAX_BULK_CHUNK_SIZE = 100_000
+
+
+class RecordParser:
+    """
+    Turns lines of an NDJSON or CSV export into dicts, one line at a time.
+
+    CSV input must start with a header row and must not contain quoted
+    newlines, which holds for the telco churn exports.
+    """
+
+    def __init__(self, fmt: str):
+        if fmt not in BULK_FORMATS:
+            raise ValueError(f"Unknown format '{fmt}', expected one of {BULK_FORMATS}")
+        self.fmt = fmt
+        self._header: Optional[list[str]] = None
+
+    def parse(self, line: str):
+        """
+        Return the record on this line, None for blank or header lines,
+        or a ValueError for a line that cannot be parsed.
+        """
+        line = line.strip()
+        if not line:
+            return None
+
+        if self.fmt == "ndjson":
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                return ValueError(f"Invalid JSON: {e}")
+            if not isinstance(record, dict):
+                return ValueError("Expected a JSON object")
+            return record
+
+        values = next(csv.reader([line]))
+        if self._header is None:
+            self._header = values
+            return None
+        if len(values) != len(self._header):
+            return ValueError(
+                f"Expected {len(self._header)} columns, got {len(values)}"
+            )
+        return dict(zip(self._header, values))
+
+
+def score_chunk(records: list, first_row: int) -> list[dict]:
+    # runs on the inference executor
+    # one output dict per record, in input order
+    start = time.perf_counter()
+    results: list[Optional[dict]] = [None] * len(records)
+    valid_positions = []
+    valid_inputs = []
+
+    for i, record in enumerate(records):
+        if isinstance(record, Exception):
+            results[i] = {'row': first_row + i, 'error': str(record)}
+            continue
+        # the rule score_db and training apply, reported instead of dropped so
+        # every input row still gets its output line
+        if is_missing_total_charges(record.get("TotalCharges", record.get("total_charges"))):
+            results[i] = {'row': first_row + i, 'error': MISSING_TOTAL_CHARGES_ERROR}
+            if "customerID" in record:
+                results[i]['customer_id'] = record["customerID"]
+            continue
+        try:
+            valid_inputs.append(ChurnInputV2.model_validate(record))
+            valid_positions.append(i)
+        except SchemaValidationError as e:
+            results[i] = {'row': first_row + i, 'error': schema_error_message(e)}
+            if "customerID" in record:
+                results[i]['customer_id'] = record["customerID"]
+
+    # exports are mostly unique customers, caching them would only evict hot entries
+    outcomes = score_inputs_v2(valid_inputs, use_cache=False) if valid_inputs else []
+
+    for i, outcome in zip(valid_positions, outcomes):
+        result = {'row': first_row + i}
+        if "customerID" in records[i]:
+            result['customer_id'] = records[i]["customerID"]
+        if isinstance(outcome, Exception):
+            result['error'] = str(outcome)
+        else:
+            proba, pred, model_version, _cached = outcome
+            result.update(
+                churn_label=bool(pred),
+                probability=proba,
+                model_version=model_version,
+            )
+        results[i] = result
+
+    elapsed = time.perf_counter() - start
+    logger.info(
+        "bulk_chunk_scored",
+        first_row=first_row,
+        num_rows=len(records),
+        num_invalid=len(records) - len(valid_inputs),
+        rows_per_sec=round(len(records) / elapsed, 1) if elapsed > 0 else None,
+    )
+    return results
+
+
+def score_lines(parser: RecordParser, lines: list[str], first_row: int) -> list[dict]:
+    # runs on the inference executor, parsing included
+    records = [record for record in map(parser.parse, lines) if record is not None]
+    return score_chunk(records, first_row) if records else []
+
+
+def score_next_lines(
+    parser: RecordParser,
+    lines: Iterator[str],
+    chunk_size: int,
+    first_row: int,
+) -> tuple[list[dict], int]:
+    # runs on the inference executor, reading included
+    # returns the results and the number of lines consumed, 0 at end of input
+    chunk = list(islice(lines, chunk_size))
+    return score_lines(parser, chunk, first_row), len(chunk)
+
+
+def iter_scored_chunks(
+    lines: Iterable[str],
+    fmt: str,
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> Iterator[list[dict]]:
+    """
+    Score an export chunk by chunk; memory is bounded by chunk_size lines.
+    """
+    parser = RecordParser(fmt)
+    lines = iter(lines)
+    first_row = 0
+
+    while True:
+        results, num_lines = score_next_lines(parser, lines, chunk_size, first_row)
+        if not num_lines:
+            return
+        first_row += len(results)
+        yield results
+
+
+def to_ndjson(results: list[dict]) -> str:
+    return "".join(json.dumps(result) + "\n" for result in results)
+
+
+def detect_format(path: Path) -> str:
+    return "csv" if path.suffix.lower() == ".csv" else "ndjson"
+
+
+def main() -> None:
+    from src.ml.load_model import registry
+
+    parser = argparse.ArgumentParser(
+        description=(
+            "Score an NDJSON or CSV customer export, writing NDJSON results. "
+            "Every input row gets one output line. Rows that cannot be scored get an "
+            "error line instead, including rows with a blank TotalCharges, which "
+            "training and score_db drop."
+        )
+    )
+    parser.add_argument("input", type=Path)
+    parser.add_argument("-o", "--output", type=Path, help="Defaults to stdout.")
+    parser.add_argument("--format", choices=BULK_FORMATS, help="Defaults to the file extension.")
+    parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    registry.load()
+    fmt = args.format or detect_format(args.input)
+    out = args.output.open("w") if args.output else sys.stdout
+
+    num_rows = 0
+    start = time.perf_counter()
+    try:
+        with args.input.open() as lines:
+            for results in iter_scored_chunks(lines, fmt, args.chunk_size):
+                out.write(to_ndjson(results))
+                num_rows += len(results)
+    finally:
+        if args.output:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    logger.info(
+        "bulk_scoring_completed",
+        num_rows=num_rows,
+        rows_per_sec=round(num_rows / elapsed, 1) if elapsed > 0 else None,
+    )
+
+
+if __name__ == "__main__":
+    main()
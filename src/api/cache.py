@@ -0,0 +1,159 @@
+"""
+cache.py
+
+Owns:
+- In-process LRU/TTL cache of predictions keyed by encoded feature vector
+- Cache hit/miss/eviction counters
+
+Does NOT:
+- Score models or encode features
+- Know about FastAPI
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from src.api.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# cache settings, overridable through the environment (size 0 disables the cache)
+CACHE_SIZE = int(os.getenv("CHURN_CACHE_SIZE", "10000"))
+CACHE_TTL_S = float(os.getenv("CHURN_CACHE_TTL_S", "300"))
+CACHE_PERSIST_HITS = os.getenv("CHURN_CACHE_PERSIST_HITS", "1") == "1"
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache of (probability, label) per feature vector.
+
+    Keys are a BLAKE2b digest of the float64 feature vector plus the model
+    version, so a vector never hits an entry scored by another model. Entries
+    older than ttl_s are treated as misses; beyond max_size the least
+    recently used entry is evicted.
+
+    clear() starts a new generation: results scored before it (e.g. by a model
+    that was swapped out mid-batch) are dropped by put_many instead of cached.
+    """
+
+    def __init__(
+        self,
+        max_size: int = CACHE_SIZE,
+        ttl_s: float = CACHE_TTL_S,
+        persist_hits: bool = CACHE_PERSIST_HITS,
+    ):
+        self.max_size = max_size
+        self.ttl_s = ttl_s
+        self.persist_hits = persist_hits
+
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._generation = 0
+        self._stale_puts = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @property
+    def generation(self) -> int:
+        """
+        Read before snapshotting the model a batch is scored with, and passed to put_many.
+        """
+        return self._generation
+
+    @staticmethod
+    def keys_for(X: np.ndarray, model_version: str) -> list[bytes]:
+        """
+        Canonical key of every row of X for the given model version.
+        """
+        # adding 0.0 turns -0.0 into 0.0 so equal vectors hash equally
+        X = np.ascontiguousarray(X, dtype=np.float64) + 0.0
+        version = model_version.encode()
+        return [
+            hashlib.blake2b(row.tobytes() + version, digest_size=16).digest()
+            for row in X
+        ]
+
+    def get_many(self, keys: list[bytes]) -> list[Optional[tuple]]:
+        """
+        Cached value per key, None for misses and expired entries.
+        """
+        now = time.monotonic()
+        values = []
+
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] < now:
+                    del self._entries[key]
+                    self._expirations += 1
+                    entry = None
+
+                if entry is None:
+                    self._misses += 1
+                    values.append(None)
+                else:
+                    self._hits += 1
+                    self._entries.move_to_end(key)
+                    values.append(entry[1])
+
+        return values
+
+    def put_many(self, keys: list[bytes], values: list[tuple], generation: Optional[int] = None) -> None:
+        expires_at = time.monotonic() + self.ttl_s
+
+        with self._lock:
+            # the cache was cleared while these were scored, they may come from the old model
+            if generation is not None and generation != self._generation:
+                self._stale_puts += len(keys)
+                return
+
+            for key, value in zip(keys, values):
+                self._entries[key] = (expires_at, value)
+                self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self, *_args) -> None:
+        """
+        Drop every entry, e.g. when the served model is swapped.
+        """
+        with self._lock:
+            num_entries = len(self._entries)
+            self._entries.clear()
+            self._generation += 1
+        logger.info("prediction_cache_cleared", num_entries=num_entries)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_s": self.ttl_s,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "generation": self._generation,
+                "stale_puts": self._stale_puts,
+            }
+
+
+# shared cache used by the scoring path
+prediction_cache = PredictionCache()
@@ -0,0 +1,256 @@
+"""
+challenger.py
+
+Owns:
+- The optional challenger model trialled against the served (champion) model
+- Shadow scoring: the challenger scores champion traffic off the request path
+- Canary routing: the share of rows answered by the challenger
+
+Does NOT:
+- Know about FastAPI or HTTP status codes
+- Own the database (predictions are handed to the write-behind writer)
+- Decide on promotion (a challenger is promoted by reloading it as the champion)
+"""
+
+import os
+import queue
+import threading
+from itertools import repeat
+from typing import Callable, Optional
+
+import numpy as np
+
+from src.api.logging_config import get_logger
+from src.api.schema import ChurnInput, ChurnInputV2
+from src.ml.features import encode_churn_inputs, encode_churn_inputs_v2
+from src.ml.load_model import MODELS_DIR, LoadedModel, ModelRegistry
+
+logger = get_logger(__name__)
+
+CHALLENGER_MODES = ("shadow", "canary")
+
+# challenger settings, overridable through the environment (no file disables the trial)
+CHALLENGER_FILE = os.getenv("CHURN_CHALLENGER_FILE", "")
+CHALLENGER_MODE = os.getenv("CHURN_CHALLENGER_MODE", "shadow")
+CANARY_PERCENT = float(os.getenv("CHURN_CANARY_PERCENT", "5"))
+SHADOW_QUEUE_SIZE = int(os.getenv("CHURN_SHADOW_QUEUE_SIZE", "10000"))
+SHADOW_BATCH_ROWS = int(os.getenv("CHURN_SHADOW_BATCH_ROWS", "1000"))
+
+if CHALLENGER_MODE not in CHALLENGER_MODES:
+    raise ValueError(
+        f"Unknown challenger mode '{CHALLENGER_MODE}', expected one of {CHALLENGER_MODES}"
+    )
+
+# shadow items are re-encoded on the shadow thread, grouped by payload schema
+ENCODERS = {
+    ChurnInput: encode_churn_inputs,
+    ChurnInputV2: encode_churn_inputs_v2,
+}
+
+# marks the end of the queue for the shadow thread
+_STOP = object()
+
+
+class ShadowScorer:
+    """
+    Scores champion traffic with the challenger on a background thread.
+
+    submit() only enqueues the already validated inputs, so the champion
+    response never waits on the challenger; when the queue is full items are
+    dropped and counted. The thread scores whatever has queued up in one
+    batch per input schema and persists the challenger's predictions under
+    the champion's request ids.
+    """
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        max_queue_size: int = SHADOW_QUEUE_SIZE,
+        max_batch_rows: int = SHADOW_BATCH_ROWS,
+    ):
+        self.registry = registry
+        self.max_queue_size = max_queue_size
+        self.max_batch_rows = max_batch_rows
+
+        self._persist: Optional[Callable[[list], None]] = None
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "dropped": 0,
+            "scored": 0,
+            "batches": 0,
+            "failed": 0,
+            "label_agreements": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self._thread is not None
+
+    def start(self, persist: Callable[[list], None]) -> None:
+        """
+        Start the shadow thread; persist receives prediction rows in the
+        (model_version, prediction, churn_label, request_id) format.
+        """
+        if self._thread is not None:
+            return
+
+        self._persist = persist
+        self._thread = threading.Thread(target=self._run, name="shadow-scorer", daemon=True)
+        self._thread.start()
+        logger.info("shadow_scoring_started", model_version=self.registry.current.version)
+
+    def stop(self) -> None:
+        """
+        Score everything still queued and stop the shadow thread.
+        """
+        if self._thread is None:
+            return
+
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        logger.info("shadow_scoring_stopped", **self.metrics())
+
+    def submit(self, inputs: list, request_ids: list[str], labels: list) -> None:
+        """
+        Queue inputs the champion scored, with its request ids and labels.
+        Never blocks and never raises.
+        """
+        if self._thread is None or not inputs:
+            return
+        try:
+            self._queue.put_nowait((inputs, request_ids, labels))
+            self._count("submitted", len(inputs))
+        except queue.Full:
+            self._count("dropped", len(inputs))
+
+    def metrics(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+
+        stats["enabled"] = self.enabled
+        stats["queue_depth"] = self._queue.qsize()
+        stats["label_agreement"] = (
+            stats["label_agreements"] / stats["scored"] if stats["scored"] else None
+        )
+        return stats
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def _run(self) -> None:
+        stopping = False
+
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            # everything queued while the previous batch was scored joins this one
+            batch = [item]
+            num_rows = len(item[0])
+            while num_rows < self.max_batch_rows:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                num_rows += len(item[0])
+
+            self._score(batch)
+
+    def _score(self, batch: list) -> None:
+        groups: dict[type, tuple[list, list, list]] = {}
+        for inputs, request_ids, labels in batch:
+            for data, request_id, label in zip(inputs, request_ids, labels):
+                group = groups.setdefault(type(data), ([], [], []))
+                group[0].append(data)
+                group[1].append(request_id)
+                group[2].append(int(label))
+
+        try:
+            served = self.registry.current
+            rows = []
+            agreements = 0
+            for input_type, (inputs, request_ids, champion_labels) in groups.items():
+                probas, labels = served.engine.predict(ENCODERS[input_type](inputs))
+                labels = labels.astype(int)
+                agreements += int(np.sum(labels == np.asarray(champion_labels)))
+                rows.extend(zip(repeat(served.version), probas.tolist(), labels.tolist(), request_ids))
+
+            self._persist(rows)
+        except Exception as e:
+            self._count("failed", sum(len(inputs) for inputs, _, _ in batch))
+            logger.error("shadow_scoring_failed", error=str(e))
+            return
+
+        with self._stats_lock:
+            self._stats["scored"] += len(rows)
+            self._stats["batches"] += 1
+            self._stats["label_agreements"] += agreements
+
+
+# the challenger has its own registry, loaded by the API lifespan when configured
+challenger_registry = ModelRegistry(MODELS_DIR / CHALLENGER_FILE) if CHALLENGER_FILE else None
+shadow_scorer = ShadowScorer(challenger_registry)
+
+
+def canary_model() -> Optional[LoadedModel]:
+    """
+    The challenger when it takes a share of live traffic, None otherwise.
+    """
+    if CHALLENGER_MODE != "canary" or challenger_registry is None:
+        return None
+    if not challenger_registry.is_ready:
+        return None
+    return challenger_registry.current
+
+
+def canary_rows(num_rows: int) -> np.ndarray:
+    """
+    Boolean mask of the rows routed to the canary, CANARY_PERCENT on average.
+    """
+    return np.random.random(num_rows) < CANARY_PERCENT / 100
+
+
+def start_challenger(persist: Callable[[list], None]) -> None:
+    """
+    Load, validate and warm up the challenger, then start its trial mode.
+    A challenger that fails to load is logged and the champion serves alone.
+    """
+    if challenger_registry is None:
+        return
+
+    try:
+        challenger_registry.reload()
+    except Exception as e:
+        logger.error("challenger_load_failed", model_file=CHALLENGER_FILE, error=str(e))
+        return
+
+    if CHALLENGER_MODE == "shadow":
+        shadow_scorer.start(persist)
+    else:
+        logger.info(
+            "canary_started",
+            model_version=challenger_registry.current.version,
+            canary_percent=CANARY_PERCENT,
+        )
+
+
+def challenger_stats() -> dict:
+    if challenger_registry is None or not challenger_registry.is_ready:
+        return {'mode': None}
+
+    stats = {'mode': CHALLENGER_MODE, 'model_version': challenger_registry.current.version}
+    if CHALLENGER_MODE == "canary":
+        stats['canary_percent'] = CANARY_PERCENT
+    else:
+        stats['shadow'] = shadow_scorer.metrics()
+    return stats
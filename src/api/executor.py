@@ -0,0 +1,137 @@
+"""
+executor.py
+
+Owns:
+- The dedicated thread pool that runs feature encoding and model scoring
+- Admission control (max in-flight requests) and per-request deadlines
+
+Does NOT:
+- Know about FastAPI or HTTP status codes
+- Encode features or score models itself
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from src.api.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# executor settings, overridable through the environment
+MAX_WORKERS = int(os.getenv("CHURN_INFERENCE_WORKERS", str(os.cpu_count() or 4)))
+MAX_IN_FLIGHT = int(os.getenv("CHURN_MAX_IN_FLIGHT", "256"))
+REQUEST_DEADLINE_S = float(os.getenv("CHURN_REQUEST_DEADLINE_S", "1.0"))
+
+
+class Overloaded(Exception):
+    """Raised when a request is rejected because too many are in flight."""
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request did not finish before its deadline."""
+
+
+class InferenceExecutor:
+    """
+    Bounded pool for CPU-bound inference work.
+
+    At most max_in_flight jobs are admitted at once, counting both queued and
+    running ones; anything beyond that is rejected immediately with Overloaded
+    instead of waiting in an unbounded queue. A job that misses its deadline
+    raises DeadlineExceeded and is cancelled if it has not started yet.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = MAX_WORKERS,
+        max_in_flight: int = MAX_IN_FLIGHT,
+        deadline_s: float = REQUEST_DEADLINE_S,
+    ):
+        self.max_workers = max_workers
+        self.max_in_flight = max_in_flight
+        self.deadline_s = deadline_s
+
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+        self._timed_out = 0
+
+    def start(self) -> None:
+        """
+        Create the worker pool. Safe to call multiple times.
+        """
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="inference"
+            )
+
+    async def run(
+        self,
+        fn: Callable,
+        *args,
+        deadline_s: Optional[float] = None,
+    ):
+        """
+        Run fn(*args) on the pool and await its result.
+        """
+        self.start()
+
+        with self._lock:
+            if self._in_flight >= self.max_in_flight:
+                self._rejected += 1
+                raise Overloaded(f"{self._in_flight} requests already in flight")
+            self._in_flight += 1
+
+        # the slot is released when the job really ends, not when the caller
+        # stops waiting, so timed out work still counts against the limit
+        future = self._pool.submit(fn, *args)
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future),
+                timeout=deadline_s or self.deadline_s,
+            )
+        except asyncio.TimeoutError:
+            future.cancel()
+            with self._lock:
+                self._timed_out += 1
+            raise DeadlineExceeded(
+                f"Request exceeded its {deadline_s or self.deadline_s}s deadline"
+            )
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def metrics(self) -> dict:
+        """
+        Snapshot of executor load and rejection counters.
+        """
+        with self._lock:
+            return {
+                "in_flight": self._in_flight,
+                "max_in_flight": self.max_in_flight,
+                "max_workers": self.max_workers,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+            }
+
+    def shutdown(self) -> None:
+        """
+        Wait for running jobs, cancel queued ones and release the pool.
+        """
+        if self._pool is None:
+            return
+
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._pool = None
+        logger.info("inference_executor_stopped", **self.metrics())
+
+
+# shared executor used by the API
+inference_executor = InferenceExecutor()
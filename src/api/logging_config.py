@@ -1,15 +1,208 @@
+"""
+logging_config.py
+
+Owns:
+- structlog configuration shared by every module
+- Per-event sampling of high-volume info events
+- The queued log sink that writes JSON lines from a background thread
+
+Does NOT:
+- Decide what gets logged (callers log their own events)
+"""
+
+import atexit
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from functools import lru_cache
+from typing import Optional
+
 import structlog
 
+# optional faster serializer
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# logging settings, overridable through the environment
+LOG_ASYNC = os.getenv("CHURN_LOG_ASYNC", "1") == "1"
+LOG_QUEUE_SIZE = int(os.getenv("CHURN_LOG_QUEUE_SIZE", "10000"))
+LOG_SERIALIZER = os.getenv("CHURN_LOG_SERIALIZER", "orjson")
+
+# e.g. "request_received=0.01,prediction_completed=0.1" keeps 1% and 10% of those events
+LOG_SAMPLE_RATES = os.getenv("CHURN_LOG_SAMPLE_RATES", "")
+
+# levels that are never sampled away
+UNSAMPLED_LEVELS = frozenset({"warning", "error", "critical", "exception"})
+
+# lines written per write() call by the sink thread
+SINK_BATCH_LINES = 256
+
+
+def parse_sample_rates(spec: str) -> dict[str, float]:
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        event, _, rate = item.partition("=")
+        rates[event.strip()] = float(rate)
+    return rates
+
+
+class EventSampler:
+    """
+    structlog processor keeping a random share of selected info events.
+    Events without a configured rate, and warnings or errors, always pass.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        self.rates = rates
+
+    def __call__(self, logger, method_name, event_dict):
+        rate = self.rates.get(event_dict.get("event"))
+        if rate is None or event_dict.get("level") in UNSAMPLED_LEVELS:
+            return event_dict
+        if random.random() >= rate:
+            raise structlog.DropEvent
+        event_dict["sample_rate"] = rate
+        return event_dict
+
+
+def _orjson_dumps(obj, default=None, **_kwargs) -> str:
+    return orjson.dumps(obj, default=default).decode()
+
+
+def _serializer():
+    if LOG_SERIALIZER == "orjson" and orjson is not None:
+        return _orjson_dumps
+    return json.dumps
+
+
+class QueuedLogSink:
+    """
+    Writes rendered log lines to stdout from a background thread.
+
+    Logging only enqueues the line; the thread writes whatever has queued up
+    with one write() per batch. When the queue is full the caller writes its
+    line itself, so nothing is lost, errors included. The thread starts on
+    first use in each process and the queue is drained at exit.
+    """
+
+    def __init__(self, max_queue_size: int = LOG_QUEUE_SIZE):
+        self.max_queue_size = max_queue_size
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._start_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        # a forked child does not inherit the parent's thread
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.max_queue_size)
+            self._thread = threading.Thread(target=self._run, name="log-sink", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def emit(self, line: str) -> None:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            self._write([line])
+
+    def _write(self, lines: list[str]) -> None:
+        with self._write_lock:
+            try:
+                sys.stdout.write("\n".join(lines) + "\n")
+                sys.stdout.flush()
+            except (OSError, ValueError):
+                # stdout closed or its reader gone, logging must never take the app down
+                pass
+
+    def _drain(self, lines: list[str]) -> list[str]:
+        while len(lines) < SINK_BATCH_LINES:
+            try:
+                lines.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return lines
+
+    def _run(self) -> None:
+        while True:
+            lines = self._drain([self._queue.get()])
+            try:
+                self._write(lines)
+            finally:
+                for _ in lines:
+                    self._queue.task_done()
+
+    def flush(self, timeout_s: float = 5.0) -> None:
+        """
+        Wait up to timeout_s until every queued line has been written.
+        """
+        if self._pid != os.getpid():
+            return
+
+        deadline = time.monotonic() + timeout_s
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                self._queue.all_tasks_done.wait(remaining)
+
+
+class QueuedLogger:
+    """
+    structlog logger handing rendered lines to a QueuedLogSink.
+    """
+
+    def __init__(self, sink: QueuedLogSink):
+        self._sink = sink
+
+    def msg(self, message: str) -> None:
+        self._sink.emit(message)
+
+    log = debug = info = warn = warning = msg
+    error = critical = exception = fatal = failure = err = msg
+
+
+class QueuedLoggerFactory:
+    def __init__(self, sink: QueuedLogSink):
+        self._logger = QueuedLogger(sink)
+
+    def __call__(self, *args) -> QueuedLogger:
+        return self._logger
+
+
+log_sink = QueuedLogSink()
+atexit.register(log_sink.flush)
+
 structlog.configure(
     processors=[
         structlog.processors.add_log_level,      # Adds 'level': 'info'
-        
+
+        # dropping sampled events before any timestamping or rendering work
+        EventSampler(parse_sample_rates(LOG_SAMPLE_RATES)),
+
         # utc param allows machine local timezone
         structlog.processors.TimeStamper(fmt="iso",  utc=False), # Adds 'timestamp': '2026-01-06T16:16:00Z'
-        structlog.processors.JSONRenderer()      # Converts to JSON string
-    ]
+        structlog.processors.JSONRenderer(serializer=_serializer())      # Converts to JSON string
+    ],
+    logger_factory=QueuedLoggerFactory(log_sink) if LOG_ASYNC else structlog.PrintLoggerFactory(),
+    # processors are resolved once per logger instead of on every call
+    cache_logger_on_first_use=True,
 )
 
-# local logger for a file
+# local logger for a file, one instance per name
+@lru_cache(maxsize=None)
 def get_logger(name: str):
     return structlog.get_logger(name)
@@ -4,7 +4,7 @@ main.py
 Owns:
 - Routing for the application
 - Performs predictions
-- Invokes mapping of ChurnInput into model features
+- Invokes scoring of ChurnInput and ChurnInputV2 payloads
 
 Does NOT:
 - Contain preprocessing logic
@@ -13,72 +13,458 @@ Does NOT:
 """
 
 # imports
-from fastapi import FastAPI, HTTPException
-from src.ml.load_model import model
-from src.ml.features import map_churn_input_to_df
-from src.api.schema import ChurnInput
+# serve is imported first so worker startup time covers every import below
+from src.api.serve import mark_ready, worker_stats
+import asyncio
+import hmac
+import io
+import tempfile
+from contextlib import asynccontextmanager
+from typing import Annotated, Any, Optional
+from fastapi import BackgroundTasks, Body, FastAPI, Header, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from src.ml.load_model import (
+    MODELS_DIR,
+    ModelNotLoadedError,
+    ModelValidationError,
+    model_watcher,
+    registry,
+)
+from src.api.schema import ChurnInput, ChurnInputV2, ModelReloadRequest
 from src.api.logging_config import get_logger
-from src.api.validators import validate_mutual_exclusivity
-from src.sql.sqlite import db
+from src.api.validators import ValidationError
+from src.api.scoring import score_batch, score_batch_v2, score_inputs, score_inputs_v2
+from src.api.executor import DeadlineExceeded, Overloaded, inference_executor
+from src.api.batching import MicroBatcher
+from src.api.cache import prediction_cache
+from src.api.challenger import challenger_stats, shadow_scorer, start_challenger
+from src.api.metrics import MetricsMiddleware, observe_parse, register_gauges, render
+from src.api.bulk import (
+    BULK_CHUNK_SIZE,
+    BULK_FORMATS,
+    MAX_BULK_CHUNK_SIZE,
+    RecordParser,
+    score_next_lines,
+    to_ndjson,
+)
+from src.sql.sqlite import get_db, get_writer
+import os
 import time
+import uuid
 
 # initialize api logger
 api_logger = get_logger(__name__)
 
+# upper bound on rows accepted by a single /predict/batch call
+MAX_BATCH_SIZE = 10_000
+
+# batches get a longer deadline than single predictions
+BATCH_DEADLINE_S = float(os.getenv("CHURN_BATCH_DEADLINE_S", "30.0"))
+
+# uploads to /v2/predict/stream larger than this are spooled to disk
+STREAM_SPOOL_MAX_BYTES = int(os.getenv("CHURN_STREAM_SPOOL_MAX_BYTES", str(8 * 1024 * 1024)))
+
+# uploads to /v2/predict/stream larger than this are rejected with 413
+STREAM_MAX_UPLOAD_BYTES = int(os.getenv("CHURN_STREAM_MAX_UPLOAD_BYTES", str(1024 * 1024 * 1024)))
+
+# run a dummy inference in the background before reporting ready
+WARMUP_ENABLED = os.getenv("CHURN_WARMUP", "1") == "1"
+
+# /admin endpoints require a matching X-Admin-Token header, and are disabled when unset
+ADMIN_TOKEN = os.getenv("CHURN_ADMIN_TOKEN")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # the model and database are only touched once the app starts, never at import
+    await asyncio.to_thread(registry.load)
+    writer = get_writer()
+    
+    # inference pool and background persistence run for the lifetime of the app
+    inference_executor.start()
+    await micro_batcher.start()
+    await micro_batcher_v2.start()
+    writer.start()
+    
+    # /readyz reports ready once the warm-up finished
+    warmup = None
+    if WARMUP_ENABLED:
+        warmup = asyncio.create_task(asyncio.to_thread(registry.warm_up))
+    else:
+        registry.mark_ready()
+    
+    # new artifacts in src/models are hot reloaded from here on
+    model_watcher.start()
+    
+    # an optional challenger is prepared in the background, the champion serves meanwhile
+    challenger = asyncio.create_task(
+        asyncio.to_thread(start_challenger, writer.save_predictions)
+    )
+    
+    mark_ready()
+    api_logger.info("worker_ready", **worker_stats())
+    yield
+    
+    model_watcher.stop()
+    await challenger
+    if warmup is not None:
+        await warmup
+    # finish running inference, then flush every queued prediction before the process exits
+    await micro_batcher.stop()
+    await micro_batcher_v2.stop()
+    inference_executor.shutdown()
+    shadow_scorer.stop()
+    writer.stop()
+    get_db().close()
+
 # api stuff
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
 
-@app.post('/predict')
-def predict(data: ChurnInput):
+async def run_inference(fn, *args, deadline_s=None):
+    # runs CPU-bound work on the bounded executor, overload degrades into fast rejections
+    try:
+        return await inference_executor.run(fn, *args, deadline_s=deadline_s)
+    except Overloaded as e:
+        api_logger.warning("request_rejected", reason=str(e))
+        raise HTTPException(status_code=503, detail="Service overloaded",
+                            headers={"Retry-After": "1"})
+    except DeadlineExceeded as e:
+        api_logger.warning("request_deadline_exceeded", reason=str(e))
+        raise HTTPException(status_code=504, detail="Prediction deadline exceeded")
+
+
+# concurrent single-row predictions are merged into one scoring call
+micro_batcher = MicroBatcher(score_inputs, inference_executor)
+micro_batcher_v2 = MicroBatcher(score_inputs_v2, inference_executor)
+
+# component state exposed as gauges on /metrics, read at scrape time
+register_gauges("writer", lambda: get_writer().metrics())
+register_gauges("executor", inference_executor.metrics)
+register_gauges("microbatch_v1", micro_batcher.metrics)
+register_gauges("microbatch_v2", micro_batcher_v2.metrics)
+register_gauges("cache", prediction_cache.metrics)
+register_gauges("shadow", shadow_scorer.metrics)
+
+
+async def predict_one(batcher: MicroBatcher, data, background_tasks: BackgroundTasks):
+    
+    # the body has been read and validated by the time the endpoint runs
+    observe_parse()
+    
+    # every prediction is traceable through its request id
+    request_id = str(uuid.uuid4())
     
     # logging that request was received
-    api_logger.info("request_received")
+    api_logger.info("request_received", request_id=request_id)
+    
+    # capture start time
+    start_ns = time.perf_counter_ns()
     
     try:
-        # mapping customer input to model features
-        validate_mutual_exclusivity(data)
-        sample = map_churn_input_to_df(data)
-    except Exception as e:
+        pred_proba, pred, model_version, cached = await asyncio.wait_for(
+            batcher.submit(data), timeout=inference_executor.deadline_s
+        )
+    except Overloaded as e:
+        api_logger.warning("request_rejected", reason=str(e))
+        raise HTTPException(status_code=503, detail="Service overloaded",
+                            headers={"Retry-After": "1"})
+    except (DeadlineExceeded, asyncio.TimeoutError) as e:
+        api_logger.warning("request_deadline_exceeded", reason=str(e))
+        raise HTTPException(status_code=504, detail="Prediction deadline exceeded")
+    except ValidationError as e:
         api_logger.warning("invalid_customer_input", error=str(e))
         raise HTTPException(status_code=400, detail="Invalid feature mapping")
+    except ModelNotLoadedError as e:
+        api_logger.warning("model_not_loaded", error=str(e))
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    except Exception as e:
+        api_logger.error("prediction_failed", error=str(e))
+        raise HTTPException(status_code=500, detail="Model prediction failed")
     
-    api_logger.info(
-        "input_mapped_to_features",
-        num_features=sample.shape[1]
-    )
+    # calculate latency in milliseconds, persistence is not part of it
+    duration_ns = time.perf_counter_ns() - start_ns
+    latency_ms = duration_ns / 1_000_000
+
+    # logging success of model prediction
+    api_logger.info("prediction_completed", latency_ms=round(latency_ms, 4), 
+            num_samples=1, request_id=request_id, cached=cached)
+    
+    # saving request into database after the response is sent,
+    # failures are dead-lettered by the writer and never reach the client
+    if not cached or prediction_cache.persist_hits:
+        background_tasks.add_task(
+            get_writer().save_prediction,
+            model_version, pred_proba, pred, request_id
+        )
+    
+    # the challenger scores the same input after the fact, if it runs in shadow mode
+    shadow_scorer.submit([data], [request_id], [pred])
+    
+    return {
+        'request_id': request_id,
+        'churn_label': bool(pred), 
+        'probability': pred_proba,
+        'model_version': model_version
+        }
+
+
+async def predict_many(score_fn, data: list, background_tasks: BackgroundTasks):
+    
+    # the body has been read and parsed as JSON by the time the endpoint runs
+    observe_parse()
+    
+    # logging that batch request was received
+    api_logger.info("batch_request_received", num_rows=len(data))
+    
+    if len(data) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch size exceeds the limit of {MAX_BATCH_SIZE} rows"
+        )
     
     # capture start time
     start_ns = time.perf_counter_ns()
     
-    pred = None
-    pred_proba = None
-    
     try:
-        # predict the user input
-        pred = model.predict(sample)[0]
-        pred_proba = model.predict_proba(sample)[0, 1]
+        # rows are validated one by one on the executor, a malformed row is reported at its index
+        results, rows, model_version, parsed = await run_inference(
+            score_fn, data, deadline_s=BATCH_DEADLINE_S
+        )
+    except HTTPException:
+        raise
+    except ModelNotLoadedError as e:
+        api_logger.warning("model_not_loaded", error=str(e))
+        raise HTTPException(status_code=503, detail="Model not loaded")
     except Exception as e:
-        api_logger.error("prediction_failed", error=str(e))
+        api_logger.error("batch_prediction_failed", error=str(e))
         raise HTTPException(status_code=500, detail="Model prediction failed")
     
-    # saving request into database
-    try: 
-        db.save_prediction(type(model).__name__, float(pred_proba), int(pred))
-        api_logger.info("prediction_persisted")        
-    except Exception as e:
-        api_logger.error("prediction_persistance_failed")
-        raise HTTPException(status_code=400, detail="Failed to save model into database.")
-    
     # calculate latency in milliseconds
     duration_ns = time.perf_counter_ns() - start_ns
     latency_ms = duration_ns / 1_000_000
+    
+    api_logger.info("batch_prediction_completed", latency_ms=round(latency_ms, 4),
+            num_samples=len(rows), num_invalid=len(data) - len(rows))
+    
+    # queueing the whole batch after the response, the writer persists it in bulk
+    if rows:
+        background_tasks.add_task(get_writer().save_predictions, rows)
+    
+    if shadow_scorer.enabled:
+        valid = [result for result in results if 'error' not in result]
+        shadow_scorer.submit(
+            [parsed[result['index']] for result in valid],
+            [result['request_id'] for result in valid],
+            [result['churn_label'] for result in valid],
+        )
+    
+    return {
+        'model_version': model_version,
+        'results': results
+        }
 
-    # logging success of model prediction
-    api_logger.info("prediction_completed", latency_ms=round(latency_ms, 4), 
-            num_samples=len(sample))
+
+@app.post('/predict')
+async def predict(data: ChurnInput, background_tasks: BackgroundTasks):
+    return await predict_one(micro_batcher, data, background_tasks)
+
+
+@app.post('/predict/batch')
+async def predict_batch(data: Annotated[list[Any], Body()], background_tasks: BackgroundTasks):
+    return await predict_many(score_batch, data, background_tasks)
+
+
+@app.post('/v2/predict')
+async def predict_v2(data: ChurnInputV2, background_tasks: BackgroundTasks):
+    # compact raw-attribute input, one-hot encoded server-side
+    return await predict_one(micro_batcher_v2, data, background_tasks)
+
+
+@app.post('/v2/predict/batch')
+async def predict_batch_v2(data: Annotated[list[Any], Body()], background_tasks: BackgroundTasks):
+    return await predict_many(score_batch_v2, data, background_tasks)
+
+
+@app.post('/v2/predict/stream')
+async def predict_stream(
+    request: Request,
+    format: Optional[str] = None,
+    chunk_size: int = BULK_CHUNK_SIZE,
+):
+    # streamed NDJSON or CSV export in, streamed NDJSON results out;
+    # only one chunk of lines is held in memory at a time
+    content_type = request.headers.get("content-type", "")
+    fmt = format or ("csv" if "csv" in content_type else "ndjson")
+    
+    if fmt not in BULK_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{fmt}'")
+    if not 1 <= chunk_size <= MAX_BULK_CHUNK_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"chunk_size must be between 1 and {MAX_BULK_CHUNK_SIZE}"
+        )
     
+    upload_too_large = HTTPException(
+        status_code=413,
+        detail=f"Upload exceeds the limit of {STREAM_MAX_UPLOAD_BYTES} bytes"
+    )
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > STREAM_MAX_UPLOAD_BYTES:
+        raise upload_too_large
+    
+    api_logger.info("stream_request_received", format=fmt, chunk_size=chunk_size)
+    
+    # the upload is spooled first (to disk past STREAM_SPOOL_MAX_BYTES): starlette
+    # cannot read the request body once the streaming response has started.
+    # writes run off the event loop, once rolled over they are blocking disk writes
+    spool = tempfile.SpooledTemporaryFile(max_size=STREAM_SPOOL_MAX_BYTES)
+    num_bytes = 0
+    try:
+        async for data in request.stream():
+            num_bytes += len(data)
+            if num_bytes > STREAM_MAX_UPLOAD_BYTES:
+                raise upload_too_large
+            await asyncio.to_thread(spool.write, data)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    lines = io.TextIOWrapper(spool, encoding="utf-8")
+    
+    async def scored_chunks():
+        parser = RecordParser(fmt)
+        first_row = 0
+        try:
+            while True:
+                try:
+                    results, num_lines = await inference_executor.run(
+                        score_next_lines, parser, lines, chunk_size, first_row,
+                        deadline_s=BATCH_DEADLINE_S
+                    )
+                except Exception as e:
+                    # the status line is already sent, so the failure is reported in-stream
+                    api_logger.error("stream_chunk_failed", first_row=first_row, error=str(e))
+                    yield to_ndjson([{'row': first_row, 'error': 'Chunk scoring failed'}])
+                    return
+                if not num_lines:
+                    break
+                first_row += len(results)
+                yield to_ndjson(results)
+        finally:
+            lines.close()
+        
+        api_logger.info("stream_request_completed", num_rows=first_row)
+    
+    return StreamingResponse(scored_chunks(), media_type="application/x-ndjson")
+
+
+@app.get('/healthz')
+def healthz():
+    # liveness: the process is up and serving http
+    return {'status': 'ok'}
+
+
+@app.get('/readyz')
+def readyz():
+    # readiness: the model is loaded and warmed up, traffic can be routed here
+    if not registry.is_ready:
+        return JSONResponse(status_code=503, content={'status': 'not_ready'})
+    return {'status': 'ready', 'model_version': registry.current.version}
+
+
+def check_admin_token(token: Optional[str]):
+    # without a configured token nobody may swap the served model
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if token is None or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@app.get('/admin/models')
+def list_models(x_admin_token: Optional[str] = Header(None)):
+    # served model and the artifacts available to reload
+    check_admin_token(x_admin_token)
+    served = registry.current if registry.is_loaded else None
     return {
-        'churn_label': bool(pred), 
-        'probability': float(pred_proba),
-        'model_version': str(type(model).__name__)
-        }
\ No newline at end of file
+        'model_version': served.version if served else None,
+        'model_file': served.path.name if served else None,
+        'available': sorted(path.name for path in MODELS_DIR.glob("*.joblib")),
+    }
+
+
+@app.post('/admin/models/reload')
+async def reload_model(
+    body: Optional[ModelReloadRequest] = None,
+    x_admin_token: Optional[str] = Header(None),
+):
+    # load, validate and warm up off the event loop; requests keep being served by
+    # the previous model until the swap, in-flight ones finish on it
+    check_admin_token(x_admin_token)
+    
+    path = None
+    if body is not None and body.model_file is not None:
+        # only plain file names inside src/models are accepted
+        if os.path.basename(body.model_file) != body.model_file:
+            raise HTTPException(status_code=400, detail="model_file must be a file name")
+        path = MODELS_DIR / body.model_file
+        if not path.is_file():
+            raise HTTPException(status_code=404, detail=f"Unknown model file '{body.model_file}'")
+    
+    previous_version = registry.current.version if registry.is_loaded else None
+    start_ns = time.perf_counter_ns()
+    
+    try:
+        loaded = await asyncio.to_thread(registry.reload, path)
+    except ModelValidationError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        api_logger.error("model_reload_failed", error=str(e))
+        raise HTTPException(status_code=500, detail="Model reload failed")
+    
+    return {
+        'model_version': loaded.version,
+        'previous_version': previous_version,
+        'reload_ms': round((time.perf_counter_ns() - start_ns) / 1_000_000, 4),
+    }
+
+
+@app.get('/metrics')
+def metrics():
+    # prometheus text exposition of latency histograms, counters and component gauges
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get('/persistence/stats')
+def persistence_stats():
+    # queue depth and counters of the background prediction writer
+    return get_writer().metrics()
+
+
+@app.get('/inference/stats')
+def inference_stats():
+    # load and rejection counters of the inference executor
+    return inference_executor.metrics()
+
+
+@app.get('/worker/stats')
+def worker_process_stats():
+    # startup time and memory usage of the worker process serving this request
+    return worker_stats()
+
+
+@app.get('/cache/stats')
+def cache_stats():
+    # size and hit/miss counters of the prediction cache
+    return prediction_cache.metrics()
+
+
+@app.get('/challenger/stats')
+def challenger_trial_stats():
+    # mode of the challenger trial, and shadow queue counters with label agreement
+    return challenger_stats()
+
+
+@app.get('/batching/stats')
+def batching_stats():
+    # batch size histograms of the micro-batching schedulers
+    return {'v1': micro_batcher.metrics(), 'v2': micro_batcher_v2.metrics()}
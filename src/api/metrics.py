@@ -0,0 +1,253 @@
+"""
+metrics.py
+
+Owns:
+- In-process latency histograms and counters for the serving path
+- Rendering them, plus component gauges, in the Prometheus text format
+- The ASGI middleware timing every request
+
+Does NOT:
+- Decide what a stage is (callers time their own stages)
+- Ship metrics anywhere (Prometheus scrapes /metrics)
+"""
+
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+# upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# perf_counter_ns at which the current request entered the app
+request_started_ns: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar(
+    "request_started_ns", default=None
+)
+
+
+class _Sharded:
+    """
+    Per-thread shards of a metric.
+
+    Every thread only ever writes its own shard, so recording takes no lock;
+    a scrape sums the shards. The registry lock is taken once per thread.
+    """
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._local = threading.local()
+        self._shards: list[dict] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _snapshot(self) -> list[tuple[tuple, list]]:
+        with self._shards_lock:
+            shards = list(self._shards)
+
+        merged: dict[tuple, list] = {}
+        for shard in shards:
+            # list() copies keys first, the owning thread may add labels meanwhile
+            for labels in list(shard):
+                values = shard[labels]
+                total = merged.get(labels)
+                if total is None:
+                    merged[labels] = list(values)
+                else:
+                    for i, value in enumerate(values):
+                        total[i] += value
+        return sorted(merged.items())
+
+    def _label_text(self, labels: tuple, extra: str = "") -> str:
+        pairs = [f'{name}="{value}"' for name, value in zip(self.labelnames, labels)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter(_Sharded):
+    def inc(self, *labels, amount: float = 1) -> None:
+        shard = self._shard()
+        values = shard.get(labels)
+        if values is None:
+            shard[labels] = [amount]
+        else:
+            values[0] += amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, (value,) in self._snapshot():
+            lines.append(f"{self.name}{self._label_text(labels)} {value}")
+        return lines
+
+
+class Histogram(_Sharded):
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labels) -> None:
+        shard = self._shard()
+        values = shard.get(labels)
+        if values is None:
+            # one count per bucket plus +Inf, then sum and count
+            values = shard[labels] = [0] * (len(self.buckets) + 3)
+        values[bisect_left(self.buckets, value)] += 1
+        values[-2] += value
+        values[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, values in self._snapshot():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), values):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{self._label_text(labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_text(labels)} {values[-2]}")
+            lines.append(f"{self.name}_count{self._label_text(labels)} {values[-1]}")
+        return lines
+
+
+# metrics of the serving path
+STAGE_SECONDS = Histogram(
+    "churn_stage_seconds",
+    "Time spent per serving stage: parse, validate, encode and score per call, persist per flush.",
+    labelnames=("stage",),
+)
+REQUEST_SECONDS = Histogram(
+    "churn_request_seconds",
+    "Total time from request start to response end.",
+    labelnames=("path",),
+)
+REQUESTS = Counter(
+    "churn_requests_total",
+    "HTTP requests by route and status code.",
+    labelnames=("path", "status"),
+)
+REQUEST_ERRORS = Counter(
+    "churn_request_errors_total",
+    "HTTP requests answered with a 5xx status code.",
+    labelnames=("path",),
+)
+ROWS_SCORED = Counter(
+    "churn_rows_scored_total",
+    "Rows scored by a model, excluding cache hits.",
+    labelnames=("model_version",),
+)
+CACHE_LOOKUPS = Counter(
+    "churn_cache_lookups_total",
+    "Prediction cache lookups by result (hit or miss).",
+    labelnames=("result",),
+)
+
+_METRICS = (STAGE_SECONDS, REQUEST_SECONDS, REQUESTS, REQUEST_ERRORS, ROWS_SCORED, CACHE_LOOKUPS)
+
+# name prefix -> callable returning a dict of component stats, read on every scrape
+_gauge_sources: dict[str, Callable[[], dict]] = {}
+
+
+@contextmanager
+def timed_stage(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage)
+
+
+def observe_parse() -> None:
+    """
+    Record the time from request start until the endpoint runs, which covers
+    reading the body and validating it against the request schema.
+    """
+    started_ns = request_started_ns.get()
+    if started_ns is not None:
+        STAGE_SECONDS.observe((time.perf_counter_ns() - started_ns) / 1e9, "parse")
+
+
+def register_gauges(prefix: str, source: Callable[[], dict]) -> None:
+    """
+    Expose every numeric value of source() as a gauge named churn_<prefix>_<key>.
+    """
+    _gauge_sources[prefix] = source
+
+
+def _render_gauges() -> list[str]:
+    lines = []
+    for prefix, source in _gauge_sources.items():
+        for key, value in source().items():
+            if isinstance(value, bool):
+                value = int(value)
+            if not isinstance(value, (int, float)):
+                continue
+            name = f"churn_{prefix}_{key}"
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+    return lines
+
+
+def render() -> str:
+    """
+    All metrics in the Prometheus text exposition format.
+    """
+    lines = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    lines.extend(_render_gauges())
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware counting requests and timing them end to end,
+    labelled by route template so path parameters cannot blow up cardinality.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_ns = time.perf_counter_ns()
+        token = request_started_ns.set(start_ns)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_started_ns.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            REQUEST_SECONDS.observe((time.perf_counter_ns() - start_ns) / 1e9, path)
+            REQUESTS.inc(path, str(status))
+            if status >= 500:
+                REQUEST_ERRORS.inc(path)
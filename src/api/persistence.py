@@ -3,6 +3,7 @@ persistance.py
 
 Owns:
 - Persistance of requests and their outputs
+- SQLite connection lifecycle (one connection per thread)
 
 Does Not: 
 - Logging configurations
@@ -10,10 +11,12 @@ Does Not:
 - ChurnInput schema
 """
 
+import os
 import sqlite3
+import threading
 import uuid
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional, Tuple
 
 from src.api.logging_config import get_logger
 
@@ -21,7 +24,22 @@ logger = get_logger(__name__)
 
 # Resolve project root safely (…/src/api/persistance.py → project root/src)
 BASE_DIR = Path(__file__).resolve().parents[1]
-DB_PATH = BASE_DIR / "sql" / "churn.db"
+DB_PATH = Path(os.getenv("CHURN_DB_PATH", str(BASE_DIR / "sql" / "churn.db")))
+
+# how long a writer waits on a locked database before giving up
+BUSY_TIMEOUT_MS = 5000
+
+# sqlite3 caches compiled statements per connection keyed by SQL text,
+# so keeping this string constant lets every insert reuse the prepared statement
+INSERT_PREDICTION_SQL = """
+    INSERT INTO predictions (
+        request_id,
+        model_version,
+        prediction,
+        churn_label
+    )
+    VALUES (?, ?, ?, ?)
+"""
 
 
 class PredictionStore:
@@ -32,12 +50,62 @@ class PredictionStore:
     - Persist derived outputs only (no raw inputs)
     - Never block inference if persistence fails
     - Provide traceability via request_id and model_version
+
+    Each thread keeps its own long-lived connection in WAL mode, so readers
+    never block the writer and no request pays the connect cost. Connections
+    are never carried across fork(): a child process opens its own.
     """
 
     def __init__(self, db_path: Path = DB_PATH):
         self.db_path = db_path
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._pid = os.getpid()
         self._initialize_db()
 
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Return the calling thread's connection, opening it on first use.
+        """
+        if self._pid != os.getpid():
+            self._reset_after_fork()
+
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+
+        # check_same_thread is off only so close() can run from another thread;
+        # a connection is never shared between threads while in use
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+
+        self._local.conn = conn
+        with self._connections_lock:
+            self._connections.append(conn)
+
+        logger.info("db_connection_opened", thread=threading.current_thread().name)
+        return conn
+
+    def _reset_after_fork(self) -> None:
+        """
+        Forget connections inherited from the parent process.
+
+        They are dropped, not closed: closing would act on the parent's
+        database handles.
+        """
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._pid = os.getpid()
+        logger.info("db_connections_reset_after_fork", pid=self._pid)
+
     def _initialize_db(self) -> None:
         """
         Create the predictions table if it does not exist.
@@ -46,7 +114,8 @@ class PredictionStore:
         try:
             self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
-            with sqlite3.connect(self.db_path) as conn:
+            conn = self._connect()
+            with conn:
                 conn.execute(
                     """
                     CREATE TABLE IF NOT EXISTS predictions (
@@ -59,7 +128,6 @@ class PredictionStore:
                     )
                     """
                 )
-                conn.commit()
 
             logger.info("db_initialized", db_path=str(self.db_path))
 
@@ -72,26 +140,19 @@ class PredictionStore:
         prediction: float,
         churn_label: int,
         request_id: Optional[str] = None,
-    ) -> None:
+    ) -> bool:
         """
         Persist a churn prediction.
 
-        This method must never raise.
+        This method must never raise; it returns False when the write failed.
         """
         request_id = request_id or str(uuid.uuid4())
 
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            conn = self._connect()
+            with conn:
                 conn.execute(
-                    """
-                    INSERT INTO predictions (
-                        request_id,
-                        model_version,
-                        prediction,
-                        churn_label
-                    )
-                    VALUES (?, ?, ?, ?)
-                    """,
+                    INSERT_PREDICTION_SQL,
                     (
                         request_id,
                         model_version,
@@ -99,13 +160,13 @@ class PredictionStore:
                         churn_label,
                     ),
                 )
-                conn.commit()
 
             logger.info(
                 "prediction_persisted",
                 request_id=request_id,
                 model_version=model_version,
             )
+            return True
 
         except Exception as e:
             # Best-effort persistence: log and continue
@@ -114,3 +175,52 @@ class PredictionStore:
                 request_id=request_id,
                 error=str(e),
             )
+            return False
+
+    def save_predictions(
+        self,
+        rows: Iterable[Tuple[str, float, int, Optional[str]]],
+    ) -> bool:
+        """
+        Persist a batch of churn predictions in a single transaction.
+
+        Each row is (model_version, prediction, churn_label, request_id).
+        This method must never raise; it returns False when the write failed.
+        """
+        params = [
+            (request_id or str(uuid.uuid4()), model_version, prediction, churn_label)
+            for model_version, prediction, churn_label, request_id in rows
+        ]
+
+        try:
+            conn = self._connect()
+            with conn:
+                conn.executemany(INSERT_PREDICTION_SQL, params)
+
+            logger.info("predictions_persisted", num_rows=len(params))
+            return True
+
+        except Exception as e:
+            # Best-effort persistence: log and continue
+            logger.error(
+                "predictions_persistence_failed",
+                num_rows=len(params),
+                error=str(e),
+            )
+            return False
+
+    def close(self) -> None:
+        """
+        Close every connection opened by this store.
+        """
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception as e:
+                logger.error("db_connection_close_failed", error=str(e))
+
+        # threads that come back after close() open a fresh connection
+        self._local = threading.local()
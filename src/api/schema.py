@@ -10,7 +10,9 @@ Does NOT:
 - Know about FastAPI
 """
 
-from pydantic import BaseModel
+from typing import Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 """
     Input schema for churn prediction.
@@ -64,4 +66,84 @@ class ChurnInput(BaseModel):
     bank_transfer_automatic_payment_method: int
     credit_card_automatic_payment_method: int
     electronic_check_payment_method: int
-    mailed_check_payment_method: int
\ No newline at end of file
+    mailed_check_payment_method: int
+
+
+YesNo = Literal["Yes", "No"]
+NoPhoneService = Literal["Yes", "No", "No phone service"]
+NoInternetService = Literal["Yes", "No", "No internet service"]
+
+# ChurnInputV2 fields that only apply with an internet service, with their column names
+INTERNET_DEPENDENT_FIELDS = {
+    "online_security": "OnlineSecurity",
+    "online_backup": "OnlineBackup",
+    "device_protection": "DeviceProtection",
+    "tech_support": "TechSupport",
+    "streaming_tv": "StreamingTV",
+    "streaming_movies": "StreamingMovies",
+}
+
+"""
+    Compact input schema for churn prediction (v2).
+    Takes the raw customer attributes of data/processed/telco_churn_clean.csv
+    and is one-hot encoded server-side, so every categorical takes exactly one
+    value of its vocabulary. Fields accept either snake_case names or the
+    dataset column names (e.g. "PaymentMethod"). The phone and internet add-ons
+    must agree with their service, as they always do in the training data.
+"""
+class ChurnInputV2(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    gender: Literal["Female", "Male"]
+    senior_citizen: int = Field(alias="SeniorCitizen", ge=0, le=1)
+    partner: YesNo = Field(alias="Partner")
+    dependents: YesNo = Field(alias="Dependents")
+    tenure: int = Field(ge=0)
+    phone_service: YesNo = Field(alias="PhoneService")
+    multiple_lines: NoPhoneService = Field(alias="MultipleLines")
+    internet_service: Literal["DSL", "Fiber optic", "No"] = Field(alias="InternetService")
+    online_security: NoInternetService = Field(alias="OnlineSecurity")
+    online_backup: NoInternetService = Field(alias="OnlineBackup")
+    device_protection: NoInternetService = Field(alias="DeviceProtection")
+    tech_support: NoInternetService = Field(alias="TechSupport")
+    streaming_tv: NoInternetService = Field(alias="StreamingTV")
+    streaming_movies: NoInternetService = Field(alias="StreamingMovies")
+    contract: Literal["Month-to-month", "One year", "Two year"] = Field(alias="Contract")
+    paperless_billing: YesNo = Field(alias="PaperlessBilling")
+    payment_method: Literal[
+        "Bank transfer (automatic)",
+        "Credit card (automatic)",
+        "Electronic check",
+        "Mailed check",
+    ] = Field(alias="PaymentMethod")
+    monthly_charges: float = Field(alias="MonthlyCharges", ge=0)
+    total_charges: float = Field(alias="TotalCharges", ge=0)
+
+    @model_validator(mode="after")
+    def check_service_dependencies(self) -> "ChurnInputV2":
+        # "No phone service" / "No internet service" exactly when the service is "No"
+        if (self.multiple_lines == "No phone service") != (self.phone_service == "No"):
+            raise ValueError(
+                "MultipleLines must be 'No phone service' if and only if PhoneService is 'No'"
+            )
+
+        no_internet = self.internet_service == "No"
+        mismatched = [
+            INTERNET_DEPENDENT_FIELDS[name]
+            for name in INTERNET_DEPENDENT_FIELDS
+            if (getattr(self, name) == "No internet service") != no_internet
+        ]
+        if mismatched:
+            raise ValueError(
+                f"{', '.join(mismatched)} must be 'No internet service' "
+                "if and only if InternetService is 'No'"
+            )
+        return self
+
+
+"""
+    Body of POST /admin/models/reload.
+    model_file names an artifact in src/models; omitted, the served artifact is reloaded.
+"""
+class ModelReloadRequest(BaseModel):
+    model_file: Optional[str] = None
@@ -0,0 +1,184 @@
+"""
+scoring.py
+
+Owns:
+- Turning parsed request payloads into predictions (encode, validate, score)
+- Parsing batch records row by row and shaping outcomes into per-row results and persistence rows
+- Serving repeated feature vectors from the prediction cache
+- Routing canary rows to the challenger model
+
+Does NOT:
+- Know about FastAPI or HTTP status codes
+- Define the feature contract (delegated to features.py)
+- Load models (delegated to load_model.py)
+"""
+
+import uuid
+from typing import Optional
+
+import numpy as np
+
+from src.api.cache import prediction_cache
+from src.api.challenger import canary_model, canary_rows
+from src.api.metrics import CACHE_LOOKUPS, ROWS_SCORED, timed_stage
+from src.api.schema import ChurnInput, ChurnInputV2
+from src.api.validators import (
+    ValidationError,
+    find_exclusivity_violations,
+    parse_rows,
+    violation_message,
+)
+from src.ml.features import encode_churn_inputs, encode_churn_inputs_v2
+from src.ml.load_model import LoadedModel, registry
+
+# cached predictions belong to the model that produced them
+registry.on_swap(prediction_cache.clear)
+
+
+def score_matrix(sample: np.ndarray, use_cache: bool = True) -> list:
+    # runs on the inference executor
+    # returns (probability, label, model_version, cached) per row, or the ValidationError of an invalid row
+    outcomes = [None] * len(sample)
+    
+    # validating every row at once, invalid rows are reported instead of failing the batch
+    with timed_stage("validate"):
+        violations = find_exclusivity_violations(sample)
+    for i, groups in violations.items():
+        outcomes[i] = ValidationError(violation_message(groups))
+    
+    if len(violations) == len(sample):
+        return outcomes
+    
+    valid_mask = np.ones(len(sample), dtype=bool)
+    valid_mask[list(violations)] = False
+    valid_indices = np.flatnonzero(valid_mask)
+    valid = sample[valid_mask] if violations else sample
+    
+    # one model snapshot per batch, a concurrent reload never splits a call;
+    # the cache generation is read first, so results of a model swapped out
+    # after this point are never cached under the new model
+    generation = prediction_cache.generation
+    served = registry.current
+    canary = canary_model()
+    if canary is None:
+        score_rows(served, valid, valid_indices.tolist(), outcomes, use_cache, generation)
+        return outcomes
+    
+    # canary rows are answered by the challenger, each row routed independently
+    to_canary = canary_rows(len(valid))
+    if to_canary.any():
+        score_rows(canary, valid[to_canary], valid_indices[to_canary].tolist(), outcomes, use_cache, generation)
+    if not to_canary.all():
+        score_rows(served, valid[~to_canary], valid_indices[~to_canary].tolist(), outcomes, use_cache, generation)
+    
+    return outcomes
+
+
+def score_rows(
+    served: LoadedModel,
+    X: np.ndarray,
+    indices: list[int],
+    outcomes: list,
+    use_cache: bool,
+    generation: Optional[int] = None,
+) -> None:
+    # scores the rows of X with one model call, writing outcomes[indices]
+    keys = None
+    if use_cache and prediction_cache.enabled:
+        # cache hits are answered directly, only misses reach the model
+        keys = prediction_cache.keys_for(X, served.version)
+        misses = []
+        for j, hit in enumerate(prediction_cache.get_many(keys)):
+            if hit is None:
+                misses.append(j)
+            else:
+                outcomes[indices[j]] = (*hit, served.version, True)
+        CACHE_LOOKUPS.inc("hit", amount=len(keys) - len(misses))
+        CACHE_LOOKUPS.inc("miss", amount=len(misses))
+        if not misses:
+            return
+        if len(misses) < len(X):
+            X = X[misses]
+            indices = [indices[j] for j in misses]
+            keys = [keys[j] for j in misses]
+    
+    with timed_stage("score"):
+        probas, labels = served.engine.predict(X)
+    ROWS_SCORED.inc(served.version, amount=len(X))
+    scored = list(zip(probas.tolist(), map(int, labels.tolist())))
+    
+    for i, (proba, label) in zip(indices, scored):
+        outcomes[i] = (proba, label, served.version, False)
+    
+    if keys is not None:
+        prediction_cache.put_many(keys, scored, generation)
+
+
+def score_inputs(data: list[ChurnInput]) -> list:
+    # mapping every row into one feature matrix
+    with timed_stage("encode"):
+        sample = encode_churn_inputs(data)
+    return score_matrix(sample)
+
+
+def score_inputs_v2(data: list[ChurnInputV2], use_cache: bool = True) -> list:
+    # expanding the raw categoricals into one feature matrix server-side
+    with timed_stage("encode"):
+        sample = encode_churn_inputs_v2(data)
+    return score_matrix(sample, use_cache=use_cache)
+
+
+def to_batch_results(outcomes: list):
+    # results keep their original position to preserve request order;
+    # the batch reports the champion's version, canary rows carry their own
+    model_version = registry.current.version
+    results = []
+    rows = []
+    for i, outcome in enumerate(outcomes):
+        if isinstance(outcome, Exception):
+            results.append({'index': i, 'error': str(outcome)})
+            continue
+        
+        proba, pred, row_version, cached = outcome
+        request_id = str(uuid.uuid4())
+        results.append({
+            'index': i,
+            'request_id': request_id,
+            'churn_label': bool(pred),
+            'probability': proba,
+            'model_version': row_version
+        })
+        if not cached or prediction_cache.persist_hits:
+            rows.append((row_version, proba, pred, request_id))
+    
+    return results, rows, model_version
+
+
+def score_records(schema, score_fn, records: list):
+    # runs on the inference executor, so per-row schema validation of a large
+    # batch never blocks the event loop; a malformed row is reported at its index
+    with timed_stage("validate"):
+        inputs, positions, errors = parse_rows(schema, records)
+    
+    scored, rows, model_version = to_batch_results(score_fn(inputs))
+    
+    # scored results are indexed among the valid rows, the response among all rows
+    results = [{'index': i, 'error': message} for i, message in errors.items()]
+    results.extend({**result, 'index': positions[result['index']]} for result in scored)
+    results.sort(key=lambda result: result['index'])
+    
+    # parsed input per response index, None for rows that failed the schema
+    parsed = [None] * len(records)
+    for position, parsed_input in zip(positions, inputs):
+        parsed[position] = parsed_input
+    return results, rows, model_version, parsed
+
+
+def score_batch(records: list):
+    # runs on the inference executor
+    return score_records(ChurnInput, score_inputs, records)
+
+
+def score_batch_v2(records: list):
+    # runs on the inference executor
+    return score_records(ChurnInputV2, score_inputs_v2, records)
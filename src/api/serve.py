@@ -0,0 +1,94 @@
+"""
+serve.py
+
+Owns:
+- Launching the API with one or more uvicorn worker processes
+- Per-process resource reporting (startup time, resident memory)
+
+Does NOT:
+- Contain routing (delegated to main.py)
+- Load models (delegated to load_model.py)
+"""
+
+import argparse
+import os
+import resource
+import time
+
+import uvicorn
+
+# captured when the serving process imports this module
+PROCESS_STARTED_AT = time.perf_counter()
+
+# time from import to mark_ready(), fixed once the worker is ready
+_startup_ms = None
+
+
+def process_rss_mb() -> float:
+    """
+    Current resident set size of this process in MB.
+    Falls back to the peak RSS where /proc is unavailable.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of this process in MB.
+    """
+    # ru_maxrss is KB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if os.uname().sysname == "Darwin" else peak / 1024
+
+
+def mark_ready() -> None:
+    """
+    Record how long this worker took to become ready to serve.
+    """
+    global _startup_ms
+    if _startup_ms is None:
+        _startup_ms = (time.perf_counter() - PROCESS_STARTED_AT) * 1000
+
+
+def worker_stats() -> dict:
+    """
+    Startup time and memory usage of this worker process.
+    """
+    return {
+        "pid": os.getpid(),
+        "startup_ms": round(_startup_ms, 4) if _startup_ms is not None else None,
+        "rss_mb": round(process_rss_mb(), 2),
+        "peak_rss_mb": round(peak_rss_mb(), 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Serve the churn API with one or more worker processes."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("CHURN_API_WORKERS", "1")),
+        help="Number of worker processes. Each loads the model memory-mapped, "
+             "so model arrays are shared through the page cache.",
+    )
+    args = parser.parse_args()
+
+    uvicorn.run(
+        "src.api.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -13,122 +13,103 @@ Does NOT:
 - Logging configuration
 """
 
+import numpy as np
+from pydantic import ValidationError as SchemaValidationError
+
 from src.api.schema import ChurnInput
+from src.ml.features import FEATURES, encode_churn_inputs
 
 class ValidationError(ValueError):
     pass
 
+# one-hot groups in FEATURES order: (name used in error messages, source column)
+FLAG_GROUPS = (
+    ("gender", "gender"),
+    ("partner", "Partner"),
+    ("dependents", "Dependents"),
+    ("phone_service", "PhoneService"),
+    ("multiple_lines", "MultipleLines"),
+    ("internet_service", "InternetService"),
+    ("online_security", "OnlineSecurity"),
+    ("online_backup", "OnlineBackup"),
+    ("device_protection", "DeviceProtection"),
+    ("tech_support", "TechSupport"),
+    ("streaming_tv", "StreamingTV"),
+    ("streaming_movies", "StreamingMovies"),
+    ("contract", "Contract"),
+    ("paperless_billing", "PaperlessBilling"),
+    ("payment_method", "PaymentMethod"),
+)
+
+GROUP_NAMES = np.array([name for name, _ in FLAG_GROUPS])
+
+# precomputes where each group's columns start in the encoded matrix,
+# the one-hot columns of a group are contiguous in FEATURES
+def _group_offsets() -> tuple[int, int, np.ndarray]:
+    starts = []
+    stop = None
+    for _, column in FLAG_GROUPS:
+        indices = [i for i, f in enumerate(FEATURES) if f.endswith(f" ({column})")]
+        if indices != list(range(indices[0], indices[-1] + 1)):
+            raise RuntimeError(f"One-hot columns of '{column}' are not contiguous")
+        if stop is not None and indices[0] != stop:
+            raise RuntimeError("One-hot groups are not adjacent in FEATURES")
+        starts.append(indices[0])
+        stop = indices[-1] + 1
+    return starts[0], stop, np.array(starts) - starts[0]
+
+ONE_HOT_START, ONE_HOT_STOP, GROUP_OFFSETS = _group_offsets()
+
+
+def find_exclusivity_violations(X: np.ndarray) -> dict[int, list[str]]:
+    """
+    Check every row of an encoded feature matrix at once.
+
+    Returns the violated group names per invalid row, valid rows are omitted.
+    """
+    group_sums = np.add.reduceat(X[:, ONE_HOT_START:ONE_HOT_STOP], GROUP_OFFSETS, axis=1)
+    rows, groups = np.nonzero(group_sums != 1)
+
+    violations: dict[int, list[str]] = {}
+    for row, group_name in zip(rows.tolist(), GROUP_NAMES[groups].tolist()):
+        violations.setdefault(row, []).append(group_name)
+    return violations
+
+
+def violation_message(groups: list[str]) -> str:
+    names = ", ".join(f"'{group}'" for group in groups)
+    return f"Exactly one option must be selected for {names}"
+
+
 def validate_mutual_exclusivity(data: ChurnInput) -> None:
-    
-    # flags
-    gender_flags = [
-        data.male,
-        data.female
-    ]
-    
-    partner_flags = [
-        data.no_partner,
-        data.yes_partner
-    ]
-    
-    dependents_flags = [
-        data.yes_dependents,
-        data.no_dependents
-    ]
-    
-    phone_service_flags = [
-        data.yes_phone_service,
-        data.no_phone_service
-    ]
-    
-    multiple_lines_flags = [
-        data.yes_multiple_lines,
-        data.no_phone_service_multiple_lines,
-        data.no_multiple_lines
-    ]
-    
-    internet_service_flags = [
-        data.dsl_internet_service,
-        data.fiber_optic_internet_service,
-        data.no_internet_service
-    ]
-    
-    online_security_flags = [
-        data.no_online_security,
-        data.no_internet_service_online_security,
-        data.yes_online_security
-    ]
-    
-    online_backup_flags = [
-        data.no_online_backup,
-        data.no_internet_service_online_backup,
-        data.yes_online_backup
-    ]
-    
-    device_protection_flags = [
-        data.no_device_protection,
-        data.no_internet_service_device_protection,
-        data.yes_device_protection
-    ]
-    
-    tech_support_flags = [
-        data.no_tech_support,
-        data.no_internet_service_tech_support,
-        data.yes_tech_support
-    ]
-    
-    streaming_movies_flags = [
-        data.no_streaming_movies,
-        data.no_internet_service_streaming_movies,
-        data.yes_streaming_movies
-    ]
-    
-    streaming_tv_flags = [
-        data.no_streaming_tv,
-        data.no_internet_service_streaming_tv,
-        data.yes_streaming_tv
-    ]
-    
-    contract_flags = [
-        data.month_to_month_contract,
-        data.one_year_contract,
-        data.two_year_contract,
-    ]
-    
-    paperless_billing_flags = [
-        data.yes_paperless_billing,
-        data.no_paperless_billing
-    ]
-    
-    payment_method_flags = [
-        data.bank_transfer_automatic_payment_method,
-        data.credit_card_automatic_payment_method,
-        data.mailed_check_payment_method,
-        data.electronic_check_payment_method
-    ]
-    
-    flag_groups = {
-        "gender": gender_flags,
-        "partner": partner_flags,
-        "dependents": dependents_flags,
-        "phone_service": phone_service_flags,
-        "multiple_lines": multiple_lines_flags,
-        "internet_service": internet_service_flags,
-        "online_security": online_security_flags,
-        "online_backup": online_backup_flags,
-        "device_protection": device_protection_flags,
-        "tech_support": tech_support_flags,
-        "streaming_tv": streaming_tv_flags,
-        "streaming_movies": streaming_movies_flags,
-        "contract": contract_flags,
-        "paperless_billing": paperless_billing_flags,
-        "payment_method": payment_method_flags,
-    }
-
-    # ensures exclusivity of features
-    for group_name, group_flags in flag_groups.items():
-        if sum(group_flags) != 1:
-            raise ValidationError(
-                f"Exactly one option must be selected for '{group_name}'"
-            )
+    # scalar wrapper over the matrix check for a single input
+    violations = find_exclusivity_violations(encode_churn_inputs(data))
+    if violations:
+        raise ValidationError(violation_message(violations[0]))
+
+
+def schema_error_message(e: SchemaValidationError) -> str:
+    """
+    One-line description of a row that failed schema validation: the invalid
+    fields, and the message of any rule spanning several fields.
+    """
+    fields = sorted({str(err["loc"][0]) for err in e.errors() if err["loc"]})
+    rules = [err["msg"].removeprefix("Value error, ") for err in e.errors() if not err["loc"]]
+    parts = ([f"Invalid fields: {fields}"] if fields else []) + rules
+    return "; ".join(parts)
+
 
+def parse_rows(schema, records: list) -> tuple[list, list[int], dict[int, str]]:
+    """
+    Validate every record against schema on its own, so one malformed row
+    never fails its batch. Returns (parsed inputs, their positions in records,
+    error message per invalid position).
+    """
+    inputs, positions, errors = [], [], {}
+    for i, record in enumerate(records):
+        try:
+            inputs.append(schema.model_validate(record))
+            positions.append(i)
+        except SchemaValidationError as e:
+            errors[i] = schema_error_message(e)
+    return inputs, positions, errors
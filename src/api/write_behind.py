@@ -0,0 +1,421 @@
+"""
+write_behind.py
+
+Owns:
+- Buffering prediction writes off the request path
+- Flushing buffered writes to the PredictionStore in bulk
+- Backpressure when the buffer is full (block, drop or spill to disk)
+- Dead-lettering rows that fail to persist, and replaying them later
+- Replaying spilled and dead-lettered rows in the background once the queue drains
+
+Does Not:
+- Own the database schema or connections (delegated to persistence.py)
+- Routing
+- ChurnInput schema
+"""
+
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+from src.api.logging_config import get_logger
+from src.api.metrics import timed_stage
+from src.api.persistence import BASE_DIR, PredictionStore
+
+logger = get_logger(__name__)
+
+BACKPRESSURE_POLICIES = ("block", "drop", "spill")
+
+# writer settings, overridable through the environment
+QUEUE_MAX_SIZE = int(os.getenv("CHURN_WRITE_QUEUE_SIZE", "10000"))
+FLUSH_MAX_ROWS = int(os.getenv("CHURN_WRITE_FLUSH_ROWS", "500"))
+FLUSH_INTERVAL_S = float(os.getenv("CHURN_WRITE_FLUSH_INTERVAL_S", "0.05"))
+BACKPRESSURE = os.getenv("CHURN_WRITE_BACKPRESSURE", "spill")
+BLOCK_TIMEOUT_S = float(os.getenv("CHURN_WRITE_BLOCK_TIMEOUT_S", "1.0"))
+# spill and dead-letter files are replayed by the writer thread whenever the queue
+# is at most REPLAY_LOW_WATER rows deep; a failed replay backs off from
+# REPLAY_RETRY_S up to MAX_REPLAY_BACKOFF_S
+REPLAY_LOW_WATER = int(os.getenv("CHURN_WRITE_REPLAY_LOW_WATER", "100"))
+REPLAY_RETRY_S = float(os.getenv("CHURN_WRITE_REPLAY_RETRY_S", "5.0"))
+MAX_REPLAY_BACKOFF_S = 300.0
+SPILL_PATH = BASE_DIR / "sql" / "predictions_spill.jsonl"
+DEAD_LETTER_PATH = BASE_DIR / "sql" / "predictions_dead_letter.jsonl"
+
+PredictionRow = Tuple[str, float, int, str]
+
+# marks the end of the queue for the writer thread
+_STOP = object()
+
+
+def _count_rows(path: Path) -> int:
+    try:
+        with path.open("rb") as f:
+            return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 16), b""))
+    except FileNotFoundError:
+        return 0
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # exists, owned by another user
+        return True
+    return True
+
+
+class WriteBehindWriter:
+    """
+    Background writer in front of a PredictionStore.
+
+    save_prediction only enqueues; a single writer thread drains the queue and
+    persists rows with one executemany per flush, triggered by whichever comes
+    first of FLUSH_MAX_ROWS rows or FLUSH_INTERVAL_S seconds.
+
+    When the queue is full the backpressure policy decides what happens:
+    - block: wait up to BLOCK_TIMEOUT_S for space, then drop
+    - drop: discard the row immediately
+    - spill: append the row to a JSONL file that is replayed once the queue drains
+
+    Flushes that fail are appended to a dead-letter JSONL file instead of being
+    lost. Between flushes, while the queue is at most replay_low_water rows
+    deep, the writer thread replays both files; after a dead-lettered flush or
+    a failed replay it waits replay_retry_s, doubling on every further failure.
+    Replays left behind by a worker that died mid-replay (*.<pid>.replaying)
+    are folded back into their file and replayed with it.
+    """
+
+    def __init__(
+        self,
+        store: PredictionStore,
+        max_queue_size: int = QUEUE_MAX_SIZE,
+        flush_max_rows: int = FLUSH_MAX_ROWS,
+        flush_interval_s: float = FLUSH_INTERVAL_S,
+        backpressure: str = BACKPRESSURE,
+        block_timeout_s: float = BLOCK_TIMEOUT_S,
+        spill_path: Path = SPILL_PATH,
+        dead_letter_path: Path = DEAD_LETTER_PATH,
+        replay_low_water: int = REPLAY_LOW_WATER,
+        replay_retry_s: float = REPLAY_RETRY_S,
+    ):
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(
+                f"Unknown backpressure policy '{backpressure}', "
+                f"expected one of {BACKPRESSURE_POLICIES}"
+            )
+
+        self.store = store
+        self.max_queue_size = max_queue_size
+        self.flush_max_rows = flush_max_rows
+        self.flush_interval_s = flush_interval_s
+        self.backpressure = backpressure
+        self.block_timeout_s = block_timeout_s
+        self.spill_path = spill_path
+        self.dead_letter_path = dead_letter_path
+        self.replay_low_water = replay_low_water
+        self.replay_retry_s = replay_retry_s
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._file_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        # only touched by the writer thread
+        self._replay_backoff_s = replay_retry_s
+        self._next_replay_at = 0.0
+        self._stats = {
+            "enqueued": 0,
+            "flushed": 0,
+            "flushes": 0,
+            "dropped": 0,
+            "spilled": 0,
+            "dead_lettered": 0,
+        }
+
+    def start(self) -> None:
+        """
+        Replay spilled and dead-lettered rows and start the writer thread.
+        """
+        if self._thread is not None:
+            return
+
+        self.replay_spill()
+        self.replay_dead_letters()
+        self._thread = threading.Thread(
+            target=self._run, name="prediction-writer", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            "write_behind_started",
+            max_queue_size=self.max_queue_size,
+            backpressure=self.backpressure,
+        )
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Flush everything still queued and stop the writer thread.
+        """
+        if self._thread is None:
+            return
+
+        # waits for the writer to make room if the queue is full
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+        logger.info("write_behind_stopped", **self.metrics())
+
+    def save_prediction(
+        self,
+        model_version: str,
+        prediction: float,
+        churn_label: int,
+        request_id: Optional[str] = None,
+    ) -> None:
+        """
+        Queue a churn prediction for persistence.
+
+        Same contract as PredictionStore.save_prediction: never raises.
+        """
+        self._enqueue(
+            (model_version, prediction, churn_label, request_id or str(uuid.uuid4()))
+        )
+
+    def save_predictions(
+        self,
+        rows: Iterable[Tuple[str, float, int, Optional[str]]],
+    ) -> None:
+        """
+        Queue a batch of churn predictions for persistence.
+
+        Each row is (model_version, prediction, churn_label, request_id).
+        """
+        for model_version, prediction, churn_label, request_id in rows:
+            self.save_prediction(model_version, prediction, churn_label, request_id)
+
+    def metrics(self) -> dict:
+        """
+        Snapshot of queue depth and writer counters.
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+
+        stats["queue_depth"] = self._queue.qsize()
+        stats["max_queue_size"] = self.max_queue_size
+        stats["spill_rows"] = _count_rows(self.spill_path)
+        stats["dead_letter_rows"] = _count_rows(self.dead_letter_path)
+        return stats
+
+    def replay_spill(self) -> int:
+        """
+        Persist rows spilled to disk while the queue was full.
+        """
+        return self._replay_file(self.spill_path) or 0
+
+    def replay_dead_letters(self) -> int:
+        """
+        Persist rows whose flush failed earlier.
+        """
+        return self._replay_file(self.dead_letter_path) or 0
+
+    def _enqueue(self, row: PredictionRow) -> None:
+        try:
+            if self.backpressure == "block":
+                self._queue.put(row, timeout=self.block_timeout_s)
+            else:
+                self._queue.put_nowait(row)
+            self._count("enqueued")
+            return
+        except queue.Full:
+            pass
+
+        if self.backpressure == "spill":
+            self._spill(row)
+        else:
+            self._count("dropped")
+            logger.warning("prediction_write_dropped", request_id=row[3])
+
+    def _spill(self, row: PredictionRow) -> None:
+        try:
+            self._append_rows(self.spill_path, [row])
+            self._count("spilled")
+        except Exception as e:
+            self._count("dropped")
+            logger.error("prediction_spill_failed", request_id=row[3], error=str(e))
+
+    def _append_rows(self, path: Path, rows: list) -> None:
+        with self._file_lock, path.open("a") as f:
+            f.writelines(json.dumps(row) + "\n" for row in rows)
+
+    def _replay_file(self, path: Path) -> Optional[int]:
+        """
+        Persist every row of a JSONL file and remove it; returns the rows
+        persisted, or None when the store failed and the rows were kept in the file.
+        """
+        replay_path = path.with_suffix(f".{os.getpid()}.replaying")
+        with self._file_lock:
+            self._adopt_orphaned_replays(path, replay_path)
+            if not path.exists():
+                return 0
+
+            # rows appended while replaying land in a fresh file
+            try:
+                os.replace(path, replay_path)
+            except FileNotFoundError:
+                # another worker process claimed the file first
+                return 0
+
+        with replay_path.open() as f:
+            rows = [tuple(json.loads(line)) for line in f if line.strip()]
+
+        if not self.store.save_predictions(rows):
+            self._append_rows(path, rows)
+            replay_path.unlink()
+            logger.error("replay_failed", path=str(path), num_rows=len(rows))
+            return None
+
+        replay_path.unlink()
+        logger.info("replay_completed", path=str(path), num_rows=len(rows))
+        return len(rows)
+
+    def _adopt_orphaned_replays(self, path: Path, replay_path: Path) -> None:
+        """
+        Move the rows of replays whose worker died mid-replay back into path.
+        Called with the file lock held.
+        """
+        for orphan in path.parent.glob(f"{path.stem}.*.replaying"):
+            pid = orphan.name[len(path.stem) + 1:-len(".replaying")]
+            if not pid.isdigit() or int(pid) == os.getpid() or _pid_alive(int(pid)):
+                continue
+
+            try:
+                os.replace(orphan, replay_path)
+            except FileNotFoundError:
+                # another worker process adopted it first
+                continue
+
+            with replay_path.open() as src, path.open("a") as dst:
+                num_rows = 0
+                for line in src:
+                    if line.strip():
+                        dst.write(line if line.endswith("\n") else line + "\n")
+                        num_rows += 1
+            replay_path.unlink()
+            logger.warning("orphaned_replay_adopted", path=str(orphan), num_rows=num_rows)
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def _maybe_replay(self) -> None:
+        # runs on the writer thread between flushes
+        if self._queue.qsize() > self.replay_low_water or time.monotonic() < self._next_replay_at:
+            return
+
+        for path in (self.spill_path, self.dead_letter_path):
+            if path.exists() and self._replay_file(path) is None:
+                self._next_replay_at = time.monotonic() + self._replay_backoff_s
+                self._replay_backoff_s = min(self._replay_backoff_s * 2, MAX_REPLAY_BACKOFF_S)
+                return
+        self._replay_backoff_s = self.replay_retry_s
+
+    def _replay_wait(self) -> Optional[float]:
+        # how long the idle writer may block before a pending file is due for replay
+        if not (self.spill_path.exists() or self.dead_letter_path.exists()):
+            return None
+        return max(self._next_replay_at - time.monotonic(), 0.0)
+
+    def _run(self) -> None:
+        stopping = False
+
+        while not stopping:
+            # wait for the first row of the next flush, or until pending files are due
+            try:
+                item = self._queue.get(timeout=self._replay_wait())
+            except queue.Empty:
+                self._maybe_replay()
+                continue
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval_s
+
+            # keep collecting until the batch is full or the interval elapses
+            while len(batch) < self.flush_max_rows:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        item = self._queue.get(timeout=remaining)
+                    else:
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._flush(batch)
+            self._maybe_replay()
+
+        # drain whatever arrived before the sentinel was processed
+        remaining_rows = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                remaining_rows.append(item)
+
+        for start in range(0, len(remaining_rows), self.flush_max_rows):
+            self._flush(remaining_rows[start:start + self.flush_max_rows])
+
+    def _flush(self, batch: list) -> None:
+        with timed_stage("persist"):
+            saved = self.store.save_predictions(batch)
+        if not saved:
+            self._dead_letter(batch)
+            return
+
+        with self._stats_lock:
+            self._stats["flushed"] += len(batch)
+            self._stats["flushes"] += 1
+
+    def _dead_letter(self, batch: list) -> None:
+        # the database just failed, give it time before replaying
+        self._next_replay_at = max(self._next_replay_at, time.monotonic() + self._replay_backoff_s)
+        try:
+            self._append_rows(self.dead_letter_path, batch)
+            self._count("dead_lettered", len(batch))
+        except Exception as e:
+            self._count("dropped", len(batch))
+            logger.error("dead_letter_failed", num_rows=len(batch), error=str(e))
+
+
+def main() -> None:
+    from src.sql.sqlite import get_db
+
+    parser = argparse.ArgumentParser(
+        description="Replay predictions that failed to persist."
+    )
+    parser.add_argument("--dead-letter", type=Path, default=DEAD_LETTER_PATH)
+    parser.add_argument("--spill", type=Path, default=SPILL_PATH)
+    args = parser.parse_args()
+
+    db = get_db()
+    writer = WriteBehindWriter(db, spill_path=args.spill, dead_letter_path=args.dead_letter)
+    replayed = writer.replay_dead_letters() + writer.replay_spill()
+    db.close()
+    print(f"Replayed {replayed} predictions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,10 @@ api_client.py
 Owns:
 - Communication with the FastAPI backend
 - HTTP request construction (payloads, headers)
-- Sending prediction requests
+- Sending prediction requests, one row or chunked batches
 - Parsing and returning API responses
 - Handling network-level errors and timeouts
+- Connection pooling, retries and backoff
 
 Does NOT:
 - Perform feature preprocessing
@@ -16,32 +17,270 @@ Does NOT:
 - Contain FastAPI server code
 """
 
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+except ImportError:  # only AsyncChurnAPIClient needs it
+    httpx = None
 
-PREDICT_ENDPOINT = "http://127.0.0.1:8000/predict"
+API_BASE_URL = os.getenv("CHURN_API_URL", "http://127.0.0.1:8000")
+PREDICT_ENDPOINT = f"{API_BASE_URL}/predict"
 TIMEOUT_SECONDS = 5
 
+# every prediction is persisted, so a POST is only retried when the server cannot
+# have accepted it: connection errors, and the 503 (overloaded, with Retry-After)
+# the API answers before scoring. A 502 or 504 may come from a proxy whose
+# upstream still persists the request, and read errors and timeouts may follow
+# a recorded prediction, so none of them are retried
+RETRIES = int(os.getenv("CHURN_API_RETRIES", "3"))
+BACKOFF_FACTOR = float(os.getenv("CHURN_API_BACKOFF_FACTOR", "0.2"))
+RETRY_STATUSES = (503,)
+MAX_BACKOFF_SECONDS = 10.0
+
+# predict_many splits payloads into batch calls of BATCH_SIZE rows, at most
+# MAX_CONCURRENCY in flight; the pool keeps that many connections alive
+BATCH_SIZE = int(os.getenv("CHURN_API_BATCH_SIZE", "500"))
+MAX_CONCURRENCY = int(os.getenv("CHURN_API_MAX_CONCURRENCY", "4"))
+
+# endpoints per API version: v1 takes one-hot payloads, v2 raw attributes
+ENDPOINTS = {
+    "v1": ("/predict", "/predict/batch"),
+    "v2": ("/v2/predict", "/v2/predict/batch"),
+}
+
 
 class ChurnAPIError(Exception):
     """Raised when the churn API request fails."""
 
 
-def predict_churn(payload: dict) -> dict:
-    try:
-        response = requests.post(
-            PREDICT_ENDPOINT,
-            json=payload,
-            timeout=TIMEOUT_SECONDS,
+def _check_response(status_code: int, text: str) -> None:
+    if status_code != 200:
+        raise ChurnAPIError(f"Churn API error {status_code}: {text}")
+
+
+def _chunks(payloads: list, size: int) -> list[list]:
+    return [payloads[i:i + size] for i in range(0, len(payloads), size)]
+
+
+def _merge_batches(responses: list[dict], batch_size: int) -> list[dict]:
+    # batch results are indexed within their chunk, predict_many indexes them in the full list
+    results = []
+    for offset, response in zip(range(0, len(responses) * batch_size, batch_size), responses):
+        for result in response["results"]:
+            results.append({**result, "index": result["index"] + offset})
+    return results
+
+
+def _backoff_seconds(attempt: int, backoff_factor: float, retry_after: Optional[str] = None) -> float:
+    # the server's Retry-After wins, otherwise exponential backoff like urllib3's Retry
+    if retry_after is not None:
+        try:
+            return min(float(retry_after), MAX_BACKOFF_SECONDS)
+        except ValueError:
+            pass
+    return min(backoff_factor * (2 ** attempt), MAX_BACKOFF_SECONDS)
+
+
+class ChurnAPIClient:
+    """
+    Thread-safe client of the churn API over one pooled, keep-alive Session.
+
+    Reuse one instance: every call shares its connections instead of opening
+    a new TCP connection per prediction.
+    """
+
+    def __init__(
+        self,
+        base_url: str = API_BASE_URL,
+        api_version: str = "v1",
+        timeout: float = TIMEOUT_SECONDS,
+        retries: int = RETRIES,
+        backoff_factor: float = BACKOFF_FACTOR,
+        batch_size: int = BATCH_SIZE,
+        max_concurrency: int = MAX_CONCURRENCY,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.predict_path, self.batch_path = ENDPOINTS[api_version]
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            other=0,
+            backoff_factor=backoff_factor,
+            backoff_max=MAX_BACKOFF_SECONDS,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "POST"}),
+            respect_retry_after_header=True,
+            # the last response is returned and reported as a ChurnAPIError
+            raise_on_status=False,
         )
-    except requests.exceptions.RequestException as e:
-        raise ChurnAPIError(f"Failed to connect to churn API: {e}")
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(max_concurrency, 1), max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _post(self, path: str, body) -> dict:
+        try:
+            response = self.session.post(self.base_url + path, json=body, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            raise ChurnAPIError(f"Failed to connect to churn API: {e}")
+
+        _check_response(response.status_code, response.text)
+        try:
+            return response.json()
+        except ValueError:
+            raise ChurnAPIError("Invalid JSON response from churn API")
+
+    def predict(self, payload: dict) -> dict:
+        return self._post(self.predict_path, payload)
+
+    def predict_batch(self, payloads: list[dict]) -> dict:
+        """
+        Score payloads in one call; returns {"model_version": ..., "results": [...]}.
+        """
+        return self._post(self.batch_path, payloads)
+
+    def predict_many(
+        self,
+        payloads: list[dict],
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> list[dict]:
+        """
+        Score any number of payloads as batch calls of batch_size rows, at most
+        max_concurrency at a time. Returns one result per payload, in order,
+        with "index" its position in payloads; rows the API rejected one by one
+        carry an "error" instead of a prediction.
+        """
+        batch_size = batch_size or self.batch_size
+        chunks = _chunks(payloads, batch_size)
+        if len(chunks) <= 1:
+            return _merge_batches([self.predict_batch(chunk) for chunk in chunks], batch_size)
 
-    if response.status_code != 200:
-        raise ChurnAPIError(
-            f"Churn API error {response.status_code}: {response.text}"
+        with ThreadPoolExecutor(max_workers=max_concurrency or self.max_concurrency) as pool:
+            return _merge_batches(list(pool.map(self.predict_batch, chunks)), batch_size)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> "ChurnAPIClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class AsyncChurnAPIClient:
+    """
+    asyncio counterpart of ChurnAPIClient over a pooled httpx.AsyncClient.
+    Requires httpx.
+    """
+
+    def __init__(
+        self,
+        base_url: str = API_BASE_URL,
+        api_version: str = "v1",
+        timeout: float = TIMEOUT_SECONDS,
+        retries: int = RETRIES,
+        backoff_factor: float = BACKOFF_FACTOR,
+        batch_size: int = BATCH_SIZE,
+        max_concurrency: int = MAX_CONCURRENCY,
+    ):
+        if httpx is None:
+            raise ImportError("AsyncChurnAPIClient requires httpx (pip install httpx)")
+
+        self.predict_path, self.batch_path = ENDPOINTS[api_version]
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max(max_concurrency, 1),
+                max_keepalive_connections=max(max_concurrency, 1),
+            ),
         )
 
-    try:
-        return response.json()
-    except ValueError:
-        raise ChurnAPIError("Invalid JSON response from churn API")
+    async def _post(self, path: str, body) -> dict:
+        # same policy as the urllib3 Retry of the sync client
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            try:
+                response = await self.client.post(path, json=body)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                # the request never reached the server
+                if last_attempt:
+                    raise ChurnAPIError(f"Failed to connect to churn API: {e}")
+                await asyncio.sleep(_backoff_seconds(attempt, self.backoff_factor))
+                continue
+            except httpx.TransportError as e:
+                raise ChurnAPIError(f"Churn API request failed: {e}")
+
+            if response.status_code in RETRY_STATUSES and not last_attempt:
+                await asyncio.sleep(_backoff_seconds(
+                    attempt, self.backoff_factor, response.headers.get("Retry-After")
+                ))
+                continue
+            break
+
+        _check_response(response.status_code, response.text)
+        try:
+            return response.json()
+        except ValueError:
+            raise ChurnAPIError("Invalid JSON response from churn API")
+
+    async def predict(self, payload: dict) -> dict:
+        return await self._post(self.predict_path, payload)
+
+    async def predict_batch(self, payloads: list[dict]) -> dict:
+        return await self._post(self.batch_path, payloads)
+
+    async def predict_many(
+        self,
+        payloads: list[dict],
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> list[dict]:
+        """
+        See ChurnAPIClient.predict_many.
+        """
+        batch_size = batch_size or self.batch_size
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        async def send(chunk: list[dict]) -> dict:
+            async with semaphore:
+                return await self.predict_batch(chunk)
+
+        responses = await asyncio.gather(*(send(chunk) for chunk in _chunks(payloads, batch_size)))
+        return _merge_batches(list(responses), batch_size)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def __aenter__(self) -> "AsyncChurnAPIClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+# shared by predict_churn, so the GUI reuses its connections across reruns
+default_client = ChurnAPIClient()
+
+
+def predict_churn(payload: dict) -> dict:
+    return default_client.predict(payload)
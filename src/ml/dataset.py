@@ -0,0 +1,126 @@
+"""
+dataset.py
+
+Owns:
+- The encoded training matrix of a CSV (X, y and the fitted encoder)
+- Caching it as .npy files keyed by the CSV content and the encoder version
+- Loading cached matrices memory-mapped, without parsing or encoding
+
+Does NOT:
+- Train models (see train_model.py)
+- Clean raw data (the CSV is expected to be data/processed output)
+- Know about FastAPI
+"""
+
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.ml.encoder import ChurnEncoder
+
+# Resolve project root safely (…/src/ml/dataset.py → project root)
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+TRAINING_DATA_PATH = PROJECT_ROOT / "data" / "processed" / "telco_churn_clean.csv"
+DATASET_CACHE_DIR = Path(
+    os.getenv("CHURN_DATASET_CACHE_DIR", str(PROJECT_ROOT / "data" / "cache"))
+)
+
+TARGET = "Churn"
+
+# the CSV is hashed in 1MB blocks, so large files never sit in memory twice
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+@dataclass(frozen=True)
+class TrainingData:
+    """
+    An encoded dataset; X and y are read-only memory maps when loaded from the cache.
+    """
+    X: np.ndarray
+    y: np.ndarray
+    encoder: ChurnEncoder
+    key: str
+    cached: bool
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _save_array(path: Path, array: np.ndarray) -> None:
+    # written aside and renamed into place, a concurrent reader never sees half a file
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, np.ascontiguousarray(array))
+    os.replace(tmp_path, path)
+
+
+def _save_encoder(path: Path, encoder: ChurnEncoder) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    encoder.save(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def load_training_data(
+    csv_path: Path = TRAINING_DATA_PATH,
+    encoder: Optional[ChurnEncoder] = None,
+    cache_dir: Optional[Path] = DATASET_CACHE_DIR,
+    rebuild: bool = False,
+) -> TrainingData:
+    """
+    Encode csv_path into (X, y), from the cache when neither the CSV nor the
+    encoder changed.
+
+    Without an encoder, one is fitted on the CSV and cached with it, so a cache
+    hit needs no parsing at all. The cache lives in <cache_dir>/<CSV sha256>/,
+    with one X/y pair per encoder version; cache_dir None disables it.
+    """
+    csv_path = Path(csv_path)
+    csv_hash = file_sha256(csv_path)[:16]
+    entry_dir = Path(cache_dir) / csv_hash if cache_dir is not None else None
+
+    df = None
+    fitted = False
+    if encoder is None:
+        if entry_dir is not None and not rebuild:
+            encoder = ChurnEncoder.load(entry_dir / "encoder.json")
+        if encoder is None:
+            df = pd.read_csv(csv_path)
+            encoder = ChurnEncoder.fit(df, exclude=[TARGET])
+            fitted = True
+
+    key = f"{csv_hash}-{encoder.version}"
+    if entry_dir is not None and not rebuild:
+        X_path = entry_dir / f"{encoder.version}.X.npy"
+        y_path = entry_dir / f"{encoder.version}.y.npy"
+        if X_path.exists() and y_path.exists():
+            return TrainingData(
+                X=np.load(X_path, mmap_mode="r"),
+                y=np.load(y_path, mmap_mode="r"),
+                encoder=encoder,
+                key=key,
+                cached=True,
+            )
+
+    if df is None:
+        df = pd.read_csv(csv_path)
+    X = encoder.transform(df)
+    y = df[TARGET].to_numpy()
+
+    if entry_dir is not None:
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        _save_array(entry_dir / f"{encoder.version}.X.npy", X)
+        _save_array(entry_dir / f"{encoder.version}.y.npy", y)
+        if fitted:
+            _save_encoder(entry_dir / "encoder.json", encoder)
+
+    return TrainingData(X=X, y=y, encoder=encoder, key=key, cached=False)
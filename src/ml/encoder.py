@@ -0,0 +1,151 @@
+"""
+encoder.py
+
+Owns:
+- The fitted one-hot encoder: the category vocabulary learned from training data
+- Encoding raw customer frames into float64 matrices in feature order
+- Persisting the vocabulary as JSON next to the model artifact
+
+Does NOT:
+- Clean raw data (blank TotalCharges etc. are handled by the caller)
+- Load models
+- Know about FastAPI
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+# churn_model_v1.joblib → churn_model_v1.encoder.json
+ENCODER_SUFFIX = ".encoder.json"
+
+
+def encoder_path_for(model_path: Path) -> Path:
+    """
+    Where the encoder of a model artifact is stored.
+    """
+    model_path = Path(model_path)
+    return model_path.with_name(model_path.stem + ENCODER_SUFFIX)
+
+
+def _split_feature(feature: str) -> tuple[str, str]:
+    # "Month-to-month (Contract)" → ("Month-to-month", "Contract"); the category
+    # itself may contain parentheses, e.g. "Bank transfer (automatic) (PaymentMethod)"
+    category, column = feature[:-1].rsplit(" (", 1)
+    return category, column
+
+
+class ChurnEncoder:
+    """
+    One-hot encoder with a fixed vocabulary.
+
+    Numeric columns pass through; every categorical column expands into one
+    "<category> (<column>)" feature per category seen at fit time, the naming
+    and order process_data uses. The vocabulary never depends on the batch
+    being encoded: a category outside it encodes as all zeros for its column,
+    which the exclusivity validator rejects.
+    """
+
+    def __init__(self, feature_names: Iterable[str], numeric_columns: Iterable[str]):
+        self.feature_names = list(feature_names)
+        self.numeric_columns = [c for c in self.feature_names if c in set(numeric_columns)]
+
+        # {column: {category: feature index}} for every categorical column
+        self.vocabulary: dict[str, dict[str, int]] = {}
+        for index, feature in enumerate(self.feature_names):
+            if feature in self.numeric_columns:
+                continue
+            category, column = _split_feature(feature)
+            self.vocabulary.setdefault(column, {})[category] = index
+
+        self._numeric_indices = np.array(
+            [self.feature_names.index(c) for c in self.numeric_columns], dtype=np.intp
+        )
+        self._category_indices = {
+            column: np.fromiter(mapping.values(), dtype=np.intp, count=len(mapping))
+            for column, mapping in self.vocabulary.items()
+        }
+
+    @property
+    def num_features(self) -> int:
+        return len(self.feature_names)
+
+    @property
+    def categories(self) -> dict[str, list[str]]:
+        return {column: list(mapping) for column, mapping in self.vocabulary.items()}
+
+    @property
+    def version(self) -> str:
+        """
+        Short content hash of the vocabulary and feature order.
+        """
+        payload = json.dumps(self.to_dict(), sort_keys=True).encode()
+        return hashlib.sha256(payload).hexdigest()[:12]
+
+    @classmethod
+    def fit(cls, df: pd.DataFrame, exclude: Iterable[str] = ()) -> "ChurnEncoder":
+        """
+        Learn the vocabulary of df, skipping the columns in exclude (e.g. the target).
+        """
+        df = df.drop(columns=list(exclude))
+        numeric_columns = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
+
+        feature_names = list(numeric_columns)
+        for column in df.columns:
+            if column in numeric_columns:
+                continue
+            # sorted like get_dummies, which produced the training columns
+            categories = sorted(df[column].dropna().unique())
+            feature_names.extend(f"{category} ({column})" for category in categories)
+
+        return cls(feature_names, numeric_columns)
+
+    def transform(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Encode df into a C-contiguous float64 matrix in feature_names order.
+        Columns of df outside the vocabulary (e.g. customerID, Churn) are ignored.
+        """
+        num_rows = len(df)
+        out = np.zeros((num_rows, self.num_features), dtype=np.float64)
+
+        if self.numeric_columns:
+            out[:, self._numeric_indices] = df[self.numeric_columns].to_numpy(dtype=np.float64)
+
+        rows = np.arange(num_rows)
+        for column, mapping in self.vocabulary.items():
+            codes = pd.Categorical(df[column], categories=list(mapping)).codes
+            known = codes >= 0
+            out[rows[known], self._category_indices[column][codes[known]]] = 1.0
+
+        return out
+
+    def to_dict(self) -> dict:
+        return {
+            "feature_names": self.feature_names,
+            "numeric_columns": self.numeric_columns,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> "ChurnEncoder":
+        return cls(payload["feature_names"], payload["numeric_columns"])
+
+    def save(self, path: Path) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2) + "\n")
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["ChurnEncoder"]:
+        """
+        The encoder stored at path, None if there is none.
+        """
+        try:
+            payload = json.loads(Path(path).read_text())
+        except FileNotFoundError:
+            return None
+        return cls.from_dict(payload)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, ChurnEncoder) and self.to_dict() == other.to_dict()
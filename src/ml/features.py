@@ -13,7 +13,13 @@ Does NOT:
 - Have preprocessing logic
 """
 
-from src.api.schema import ChurnInput
+from itertools import chain
+from operator import attrgetter
+from typing import Union
+
+from src.api.schema import ChurnInput, ChurnInputV2
+from src.ml.encoder import ChurnEncoder
+import numpy as np
 import pandas as pd
 
 # model features
@@ -67,7 +73,11 @@ FEATURES = [
 
 # this function takes ChurnInput schema and converts it into dataframe for the model to use.
 def map_churn_input_to_df(data: ChurnInput):
-  return pd.DataFrame([{
+  return pd.DataFrame([_churn_input_to_row(data)])[FEATURES]
+
+# maps a single ChurnInput onto the model feature names
+def _churn_input_to_row(data: ChurnInput) -> dict:
+  return {
     "SeniorCitizen": data.senior_citizen,
     "tenure": data.tenure,
     "MonthlyCharges": data.monthly_charges,
@@ -113,4 +123,78 @@ def map_churn_input_to_df(data: ChurnInput):
     "Credit card (automatic) (PaymentMethod)": int(data.credit_card_automatic_payment_method),
     "Electronic check (PaymentMethod)": int(data.electronic_check_payment_method),
     "Mailed check (PaymentMethod)": int(data.mailed_check_payment_method)
-  }])[FEATURES]
\ No newline at end of file
+  }
+
+
+# ChurnInput field feeding each model feature, in FEATURES order.
+# Generated once by running the dataframe mapping on a probe input whose field
+# values are their own positions, so both paths can never disagree.
+def _build_feature_fields() -> tuple:
+  fields = list(ChurnInput.model_fields)
+  probe = ChurnInput.model_construct(**{f: i for i, f in enumerate(fields)})
+  row = _churn_input_to_row(probe)
+  return tuple(fields[row[feature]] for feature in FEATURES)
+
+FEATURE_FIELDS = _build_feature_fields()
+NUM_FEATURES = len(FEATURES)
+_feature_getter = attrgetter(*FEATURE_FIELDS)
+
+# this function writes one or many ChurnInputs straight into a float64 matrix in FEATURES order.
+# map_churn_input_to_df stays available as the reference path for parity checks.
+def encode_churn_inputs(data: Union[ChurnInput, list[ChurnInput]]) -> np.ndarray:
+  if isinstance(data, ChurnInput):
+    data = [data]
+  num_rows = len(data)
+  # fromiter with an explicit count preallocates the buffer and fills it in a single pass
+  return np.fromiter(
+    chain.from_iterable(map(_feature_getter, data)),
+    dtype=np.float64,
+    count=num_rows * NUM_FEATURES,
+  ).reshape(num_rows, NUM_FEATURES)
+
+
+# numeric model features, passed through unchanged
+NUMERIC_FEATURES = ["SeniorCitizen", "tenure", "MonthlyCharges", "TotalCharges"]
+
+# encoder with the vocabulary the model was trained on: FEATURES holds the
+# "<category> (<column>)" columns fitted on the training set
+SERVING_ENCODER = ChurnEncoder(FEATURES, NUMERIC_FEATURES)
+
+# category vocabulary per raw column, e.g. {"Contract": {"Month-to-month": 36, ...}},
+# mapping each category to its one-hot column in FEATURES
+CATEGORY_VOCAB = SERVING_ENCODER.vocabulary
+
+# ChurnInputV2 field holding each raw column, resolved through the field aliases
+_V2_FIELDS = {
+  (info.alias or name): name for name, info in ChurnInputV2.model_fields.items()
+}
+_V2_NUMERIC_INDICES = np.array([FEATURES.index(f) for f in NUMERIC_FEATURES])
+_v2_numeric_getter = attrgetter(*(_V2_FIELDS[f] for f in NUMERIC_FEATURES))
+_v2_category_getter = attrgetter(*(_V2_FIELDS[c] for c in CATEGORY_VOCAB))
+_v2_category_maps = tuple(CATEGORY_VOCAB.values())
+
+# this function expands one or many ChurnInputV2 into the same float64 matrix encode_churn_inputs builds
+def encode_churn_inputs_v2(data: Union[ChurnInputV2, list[ChurnInputV2]]) -> np.ndarray:
+  if isinstance(data, ChurnInputV2):
+    data = [data]
+  num_rows = len(data)
+  out = np.zeros((num_rows, NUM_FEATURES), dtype=np.float64)
+
+  out[:, _V2_NUMERIC_INDICES] = np.fromiter(
+    chain.from_iterable(map(_v2_numeric_getter, data)),
+    dtype=np.float64,
+    count=num_rows * len(NUMERIC_FEATURES),
+  ).reshape(num_rows, len(NUMERIC_FEATURES))
+
+  # one column index per (row, categorical), then a single scatter of ones
+  hot_columns = np.fromiter(
+    (
+      mapping[value]
+      for values in map(_v2_category_getter, data)
+      for mapping, value in zip(_v2_category_maps, values)
+    ),
+    dtype=np.intp,
+    count=num_rows * len(_v2_category_maps),
+  )
+  out[np.repeat(np.arange(num_rows), len(_v2_category_maps)), hot_columns] = 1.0
+  return out
@@ -0,0 +1,258 @@
+"""
+incremental.py
+
+Owns:
+- Incremental training of an SGD logistic-loss model with partial_fit
+- Streaming labeled customers in chunks from a CSV or the customers table
+- Checkpointing after every chunk and resuming from the checkpoint
+- Publishing the result as the next versioned artifact
+
+Does NOT:
+- Hold more than one chunk of data in memory
+- Full retrains or model selection (see train_model.py and model_search.py)
+- Know about FastAPI
+
+Usage:
+    python -m src.ml.incremental [--csv CSV | --db DB] [--chunk-size 1000] [--resume] [--no-publish]
+
+With --resume, training continues from the checkpoint: the customers table
+is read from the first rowid after the checkpoint, so rerunning on a grown
+table trains only on the new rows.
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Iterator, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import roc_auc_score
+from sklearn.preprocessing import StandardScaler
+
+from src.api.logging_config import get_logger
+from src.api.validators import find_exclusivity_violations
+from src.ml.dataset import PROJECT_ROOT, TARGET
+from src.ml.features import SERVING_ENCODER
+from src.ml.load_model import MODELS_DIR, next_version_path
+from src.ml.preprocessing import drop_missing_total_charges
+from src.ml.train_model import save_artifact
+from src.sql.score_db import CUSTOMERS_DB_PATH, plan_chunks
+
+logger = get_logger(__name__)
+
+CHECKPOINT_PATH = PROJECT_ROOT / "data" / "checkpoints" / "incremental.joblib"
+DEFAULT_CHUNK_SIZE = 1000
+CLASSES = np.array([0, 1])
+
+# the raw customers table labels churn as Yes/No, the processed CSV as 1/0
+_LABELS = {"Yes": 1, "No": 0}
+
+
+def prepare_chunk(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Clean and encode a chunk of labeled customers into (X, y).
+
+    Mirrors ml/notebooks/02_data_cleaning.ipynb: rows without a numeric
+    TotalCharges or a label are dropped. So are rows with a category outside
+    the encoder's vocabulary, which would train on an all-zero one-hot group.
+    """
+    df = drop_missing_total_charges(df)
+    if not pd.api.types.is_numeric_dtype(df[TARGET]):
+        df[TARGET] = df[TARGET].map(_LABELS)
+    df = df.dropna(subset=[TARGET])
+    X, y = SERVING_ENCODER.transform(df), df[TARGET].to_numpy(dtype=np.int64)
+
+    violations = find_exclusivity_violations(X)
+    if violations:
+        logger.warning(
+            "incremental_rows_skipped",
+            reason="unknown_category",
+            num_rows=len(violations),
+            groups=sorted({group for groups in violations.values() for group in groups}),
+        )
+        keep = np.ones(len(X), dtype=bool)
+        keep[list(violations)] = False
+        X, y = X[keep], y[keep]
+    return X, y
+
+
+def iter_csv_chunks(csv_path: Path, chunk_size: int, skip_rows: int = 0) -> Iterator[tuple[pd.DataFrame, dict]]:
+    """
+    Yield (chunk, position) pairs after the first skip_rows data rows;
+    position is what a checkpoint resumes from.
+
+    The position counts rows, not chunks, so a run can resume with another
+    chunk size without retraining on or skipping any row.
+    """
+    reader = pd.read_csv(csv_path, chunksize=chunk_size, skiprows=range(1, skip_rows + 1))
+    rows = skip_rows
+    for df in reader:
+        if df.empty:
+            continue
+        rows += len(df)
+        yield df, {"rows_read": rows}
+
+
+def iter_db_chunks(db_path: Path, chunk_size: int, after_rowid: int = 0) -> Iterator[tuple[pd.DataFrame, dict]]:
+    """
+    Yield (chunk, position) pairs of the customers table after after_rowid,
+    paginated by rowid like score_db.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        for first_rowid, last_rowid in plan_chunks(conn, chunk_size):
+            if last_rowid <= after_rowid:
+                continue
+            df = pd.read_sql(
+                "SELECT * FROM customers WHERE rowid BETWEEN ? AND ? ORDER BY rowid",
+                conn,
+                params=(max(first_rowid, after_rowid + 1), last_rowid),
+            )
+            yield df, {"last_rowid": last_rowid}
+    finally:
+        conn.close()
+
+
+class IncrementalTrainer:
+    """
+    An SGD logistic-loss model trained one chunk at a time.
+
+    Features are standardized with running statistics (StandardScaler.partial_fit)
+    and rows are weighted by the running class balance, the streaming
+    counterpart of the batch model's class_weight='balanced'. export() folds
+    the scaler into the coefficients, so the published model takes raw
+    FEATURES rows and is served on the InferenceEngine fast path.
+    """
+
+    def __init__(self, alpha: float = 1e-4, random_state: int = 42):
+        self.model = SGDClassifier(loss="log_loss", alpha=alpha, average=True, random_state=random_state)
+        self.scaler = StandardScaler()
+        self.class_counts = np.zeros(len(CLASSES), dtype=np.int64)
+        self.rows_seen = 0
+        self.position: dict = {}
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.rows_seen > 0
+
+    def partial_fit(self, X: np.ndarray, y: np.ndarray) -> Optional[float]:
+        """
+        Train on one chunk; returns the chunk's ROC-AUC scored before training
+        on it (progressive validation), None for the first chunk or a one-class chunk.
+        """
+        auc = None
+        if self.is_fitted and len(np.unique(y)) == 2:
+            auc = roc_auc_score(y, self.model.decision_function(self.scaler.transform(X)))
+
+        self.scaler.partial_fit(X)
+        self.class_counts += np.bincount(y, minlength=len(CLASSES))
+        weights = self.class_counts.sum() / (len(CLASSES) * np.maximum(self.class_counts, 1))
+
+        self.model.partial_fit(self.scaler.transform(X), y, classes=CLASSES, sample_weight=weights[y])
+        self.rows_seen += len(y)
+        return auc
+
+    def export(self) -> SGDClassifier:
+        """
+        A copy of the model that scores unscaled rows:
+        w·((x - mean) / scale) + b  ==  (w / scale)·x + (b - w·(mean / scale))
+        """
+        exported = SGDClassifier(**self.model.get_params())
+        exported.classes_ = self.model.classes_
+        exported.n_features_in_ = self.model.n_features_in_
+        exported.coef_ = self.model.coef_ / self.scaler.scale_
+        exported.intercept_ = self.model.intercept_ - exported.coef_ @ self.scaler.mean_
+        exported.custom_name = "sgd_log_loss_incremental"
+        return exported
+
+    def save_checkpoint(self, path: Path) -> None:
+        # written aside and renamed, an interrupted run keeps the previous checkpoint
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        joblib.dump(self, tmp_path)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load_checkpoint(path: Path) -> Optional["IncrementalTrainer"]:
+        return joblib.load(path) if path.exists() else None
+
+
+def train_incremental(
+    trainer: IncrementalTrainer,
+    chunks: Iterator[tuple[pd.DataFrame, dict]],
+    checkpoint_path: Optional[Path],
+) -> int:
+    """
+    Feed chunks to the trainer, checkpointing after each; returns the chunks consumed.
+    """
+    num_chunks = 0
+    for df, position in chunks:
+        start = time.perf_counter()
+        X, y = prepare_chunk(df)
+        auc = trainer.partial_fit(X, y) if len(y) else None
+        trainer.position = position
+        if checkpoint_path is not None:
+            trainer.save_checkpoint(checkpoint_path)
+
+        num_chunks += 1
+        logger.info(
+            "incremental_chunk_trained",
+            rows=len(y),
+            rows_seen=trainer.rows_seen,
+            progressive_roc_auc=round(auc, 5) if auc is not None else None,
+            chunk_ms=round((time.perf_counter() - start) * 1000, 2),
+            **position,
+        )
+    return num_chunks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Train the churn model incrementally on chunks of labeled customers."
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--csv", type=Path, help="Labeled CSV (e.g. data/processed/telco_churn_clean.csv).")
+    source.add_argument("--db", type=Path, default=CUSTOMERS_DB_PATH, help="Database with a customers table.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--alpha", type=float, default=1e-4, help="SGD regularization strength.")
+    parser.add_argument("--random-state", type=int, default=42)
+    parser.add_argument("--checkpoint", type=Path, default=CHECKPOINT_PATH)
+    parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint.")
+    parser.add_argument("--no-publish", action="store_true", help="Only update the checkpoint.")
+    args = parser.parse_args()
+
+    trainer = IncrementalTrainer.load_checkpoint(args.checkpoint) if args.resume else None
+    if trainer is None:
+        trainer = IncrementalTrainer(alpha=args.alpha, random_state=args.random_state)
+
+    if args.csv:
+        if "chunks" in trainer.position:
+            parser.error("the checkpoint predates row-based resume, rerun without --resume")
+        chunks = iter_csv_chunks(args.csv, args.chunk_size, trainer.position.get("rows_read", 0))
+    else:
+        chunks = iter_db_chunks(args.db, args.chunk_size, trainer.position.get("last_rowid", 0))
+
+    start = time.perf_counter()
+    num_chunks = train_incremental(trainer, chunks, args.checkpoint)
+    logger.info(
+        "incremental_training_finished",
+        chunks=num_chunks,
+        rows_seen=trainer.rows_seen,
+        seconds=round(time.perf_counter() - start, 3),
+    )
+
+    if not trainer.is_fitted:
+        parser.error("no labeled rows to train on")
+    if num_chunks and not args.no_publish:
+        output = next_version_path(MODELS_DIR)
+        save_artifact(trainer.export(), SERVING_ENCODER, output)
+        logger.info("incremental_model_published", model_path=str(output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+inference.py
+
+Owns:
+- Scoring encoded feature matrices with a loaded model
+- Fast-path scoring for linear models
+- Parity checks between the fast path and sklearn
+
+Does NOT:
+- Load models (delegated to load_model.py)
+- Map ChurnInput into model features
+- Know about FastAPI
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.special import expit
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+
+from src.ml.features import FEATURES, SERVING_ENCODER
+
+# Resolve project root safely (…/src/ml/inference.py → project root)
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+PARITY_DATA_PATH = PROJECT_ROOT / "data" / "processed" / "telco_churn_clean.csv"
+
+
+def _is_logistic(model) -> bool:
+    # both predict_proba as the sigmoid of their decision function
+    if isinstance(model, SGDClassifier):
+        return model.loss == "log_loss"
+    return isinstance(model, LogisticRegression)
+
+
+class InferenceEngine:
+    """
+    Scores feature matrices in FEATURES order.
+
+    Binary LogisticRegression models, and SGDClassifier models with the
+    logistic loss, are scored directly from coef_/intercept_ with one dot
+    product and a sigmoid, which skips sklearn's input validation and computes
+    the decision function once for both probability and label.
+    Any other estimator falls back to sklearn's predict_proba.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        # owned copies: a memory-mapped artifact rewritten in place must not
+        # pull the arrays served from out from under the process (SIGBUS)
+        self.classes = np.array(model.classes_, copy=True)
+        self.is_fast_path = (
+            _is_logistic(model)
+            and self.classes.size == 2
+            and model.coef_.shape == (1, len(FEATURES))
+        )
+
+        if self.is_fast_path:
+            self._coef = np.array(model.coef_.ravel(), dtype=np.float64, copy=True)
+            self._intercept = float(np.array(model.intercept_, dtype=np.float64, copy=True)[0])
+
+    def predict(self, X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return (churn probability, predicted label) for every row of X.
+        """
+        if self.is_fast_path:
+            decision = X @ self._coef + self._intercept
+            # same thresholding as LogisticRegression.predict for binary problems
+            labels = self.classes[(decision > 0).astype(np.intp)]
+            return expit(decision), labels
+
+        proba = self.model.predict_proba(X)
+        labels = self.classes[proba.argmax(axis=1)]
+        return proba[:, 1], labels
+
+
+def load_parity_matrix(csv_path: Path = PARITY_DATA_PATH) -> np.ndarray:
+    """
+    Encode the processed churn dataset into a matrix in FEATURES order.
+    """
+    return SERVING_ENCODER.transform(pd.read_csv(csv_path))
+
+
+def check_parity(engine: InferenceEngine, X: np.ndarray) -> dict:
+    """
+    Compare the engine against sklearn's predict_proba/predict on X.
+    """
+    proba, labels = engine.predict(X)
+    expected_proba = engine.model.predict_proba(X)[:, 1]
+    expected_labels = engine.model.predict(X)
+
+    return {
+        "num_rows": int(X.shape[0]),
+        "fast_path": engine.is_fast_path,
+        "max_abs_diff": float(np.max(np.abs(proba - expected_proba))),
+        "label_mismatches": int(np.sum(labels != expected_labels)),
+    }
+
+
+def main() -> None:
+    from src.ml.load_model import registry
+
+    parser = argparse.ArgumentParser(
+        description="Check fast-path inference parity against sklearn."
+    )
+    parser.add_argument("--data", type=Path, default=PARITY_DATA_PATH)
+    parser.add_argument("--atol", type=float, default=1e-9)
+    args = parser.parse_args()
+
+    report = check_parity(registry.load().engine, load_parity_matrix(args.data))
+    print(report)
+
+    if report["max_abs_diff"] > args.atol or report["label_mismatches"]:
+        raise SystemExit("Parity check failed.")
+    print("Parity check passed.")
+
+
+if __name__ == "__main__":
+    main()
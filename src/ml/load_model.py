@@ -1,37 +1,414 @@
 """
-main.py
+load_model.py
 
 Owns:
-- Routing for the application
-- Performs the predictions
-- Peforms the mapping of ChurnInput into model features
+- Loading the serialized churn model
+- Holding the currently served model and its inference engine
+- Warming the model up before it receives traffic
+- Hot reloading: validating a new artifact and swapping it in atomically
+- Naming versioned artifacts in src/models
 
 Does NOT:
 - Have functionality of preprocessing data
 - Train the model & save it
-- Load the model
+- Know about FastAPI
 """
 
+import os
+import re
+import threading
+import time
+import warnings
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
 import joblib
+import numpy as np
 from src.api.logging_config import get_logger
+from src.ml.dataset import file_sha256
+from src.ml.encoder import ChurnEncoder, encoder_path_for
+from src.ml.features import NUM_FEATURES, SERVING_ENCODER
+from src.ml.inference import (
+    PARITY_DATA_PATH,
+    InferenceEngine,
+    check_parity,
+    load_parity_matrix,
+)
+
+# Resolve model artifacts relative to the package (…/src/ml/load_model.py → src/models)
+MODELS_DIR = Path(__file__).resolve().parents[1] / "models"
+MODEL_PATH = MODELS_DIR / os.getenv("CHURN_MODEL_FILE", "churn_model_v1.joblib")
+
+# off by default: a memory-mapped artifact that is rewritten in place (joblib.dump
+# or cp onto the served file) crashes the process with SIGBUS. "r" shares the
+# arrays across workers through the page cache, and is only safe when artifacts
+# are immutable and published with os.replace (save_artifact)
+MODEL_MMAP_MODE = os.getenv("CHURN_MODEL_MMAP_MODE", "") or None
+
+# versioned artifacts are named churn_model_v<N>.joblib
+MODEL_NAME = "churn_model"
+VERSIONED_MODEL_PATTERN = re.compile(rf"^{MODEL_NAME}_v(\d+)\.joblib$")
 
-MODEL_PATH = "./src/models/churn_model_v1.joblib"
+# hot reload settings (a watch interval of 0 disables the directory watcher)
+MODEL_WATCH_INTERVAL_S = float(os.getenv("CHURN_MODEL_WATCH_INTERVAL_S", "5.0"))
+RELOAD_PARITY_ATOL = float(os.getenv("CHURN_RELOAD_PARITY_ATOL", "1e-9"))
+
+# training publishes new versions next to the served one; they are only promoted
+# by the watcher when opted in, otherwise through the admin reload endpoint
+MODEL_AUTO_PROMOTE = os.getenv("CHURN_MODEL_AUTO_PROMOTE", "0") == "1"
 
 model_loader_logger = get_logger(__name__)
 
-# load model
-model_loader_logger.info("starting_load")
-model = None
-
-try:
-    model = joblib.load(MODEL_PATH)
-except Exception as e:
-    model_loader_logger.error("load_failed", error=str(e))
-    raise
-
-model_loader_logger.info(
-    "model_loaded",
-    model_path=MODEL_PATH,
-    model_type=type(model).__name__,
-    model_name=getattr(model, "custom_name", "unknown")
+# the API feeds the model NumPy matrices built in FEATURES order (see features.py),
+# so sklearn's missing feature names warning carries no information at inference time
+warnings.filterwarnings(
+    "ignore",
+    message="X does not have valid feature names",
+    category=UserWarning,
 )
+
+
+class ModelNotLoadedError(RuntimeError):
+    """Raised when the model is requested before it has been loaded."""
+
+
+class ModelValidationError(ValueError):
+    """Raised when a candidate artifact cannot replace the served model."""
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """
+    A loaded model together with everything needed to serve it.
+    """
+    model: Any
+    engine: InferenceEngine
+    version: str
+    path: Path
+    # vocabulary the model was trained with, None for artifacts saved without one
+    encoder: Optional[ChurnEncoder] = None
+
+
+def model_version(path: Path) -> str:
+    """
+    Version reported for an artifact: its file name without extension plus a
+    short hash of its contents (e.g. churn_model_v1-1a2b3c4d), so an artifact
+    rewritten in place gets a new version.
+    """
+    return f"{Path(path).stem}-{file_sha256(path)[:8]}"
+
+
+def _version_number(path: Path) -> Optional[int]:
+    match = VERSIONED_MODEL_PATTERN.match(Path(path).name)
+    return int(match.group(1)) if match else None
+
+
+def versioned_model_paths(models_dir: Path = MODELS_DIR) -> list[Path]:
+    """
+    Versioned artifacts in models_dir, oldest version first.
+    """
+    paths = [
+        path for path in Path(models_dir).glob(f"{MODEL_NAME}_v*.joblib")
+        if _version_number(path) is not None
+    ]
+    return sorted(paths, key=_version_number)
+
+
+def latest_model_path(models_dir: Path = MODELS_DIR) -> Optional[Path]:
+    paths = versioned_model_paths(models_dir)
+    return paths[-1] if paths else None
+
+
+def next_version_path(models_dir: Path = MODELS_DIR) -> Path:
+    """
+    Path for the next versioned artifact, e.g. churn_model_v2.joblib after v1.
+    """
+    latest = latest_model_path(models_dir)
+    version = _version_number(latest) if latest else 0
+    return Path(models_dir) / f"{MODEL_NAME}_v{version + 1}.joblib"
+
+
+def warm_up_engine(engine: InferenceEngine, num_rows: int = 256) -> None:
+    # one single-row and one batch-sized call cover both serving shapes
+    engine.predict(np.zeros((1, NUM_FEATURES)))
+    engine.predict(np.zeros((num_rows, NUM_FEATURES)))
+
+
+class ModelRegistry:
+    """
+    Owns the model served by the API.
+
+    Nothing is loaded at import time: load() is called from the API lifespan,
+    and warm_up() primes the inference path with a dummy prediction so the
+    first real request does not pay for lazy initialization.
+
+    reload() prepares a new artifact off the request path and swaps it in by
+    replacing a single reference. Scoring code reads `current` once per batch,
+    so in-flight requests finish on the model they started with.
+    """
+
+    def __init__(self, path: Path = MODEL_PATH, mmap_mode: Optional[str] = MODEL_MMAP_MODE):
+        self.path = Path(path)
+        self.mmap_mode = mmap_mode
+        self._current: Optional[LoadedModel] = None
+        self._warm = threading.Event()
+        self._swap_listeners: list[Callable[[LoadedModel], None]] = []
+        # serializes reloads, never taken by scoring
+        self._reload_lock = threading.Lock()
+        self._parity_matrix: Optional[np.ndarray] = None
+
+    def on_swap(self, callback: Callable[[LoadedModel], None]) -> None:
+        """
+        Call callback with the new LoadedModel whenever the served model changes,
+        e.g. to invalidate state derived from the previous model.
+        """
+        self._swap_listeners.append(callback)
+
+    def _load_artifact(self, path: Path) -> LoadedModel:
+        model_loader_logger.info("starting_load", model_path=str(path))
+        start_ns = time.perf_counter_ns()
+
+        try:
+            model = joblib.load(path, mmap_mode=self.mmap_mode)
+        except Exception as e:
+            model_loader_logger.error("load_failed", model_path=str(path), error=str(e))
+            raise
+
+        # scoring engine built once from the loaded model
+        engine = InferenceEngine(model)
+        loaded = LoadedModel(
+            model=model,
+            engine=engine,
+            version=model_version(path),
+            path=path,
+            encoder=ChurnEncoder.load(encoder_path_for(path)),
+        )
+
+        model_loader_logger.info(
+            "model_loaded",
+            model_path=str(path),
+            model_version=loaded.version,
+            mmap_mode=self.mmap_mode,
+            load_ms=round((time.perf_counter_ns() - start_ns) / 1_000_000, 4),
+            model_type=type(model).__name__,
+            model_name=getattr(model, "custom_name", "unknown"),
+            fast_path=engine.is_fast_path,
+            encoder_version=loaded.encoder.version if loaded.encoder else None,
+        )
+        return loaded
+
+    def _swap(self, loaded: LoadedModel) -> None:
+        # a single reference assignment, readers see either the old or the new model
+        self._current = loaded
+        self.path = loaded.path
+        for callback in self._swap_listeners:
+            callback(loaded)
+
+    def load(self, path: Optional[Path] = None) -> LoadedModel:
+        """
+        Load the model artifact and make it the served model.
+        """
+        loaded = self._load_artifact(Path(path) if path else self.path)
+        self._swap(loaded)
+        return loaded
+
+    def validate(self, loaded: LoadedModel) -> dict:
+        """
+        Check that a loaded model can serve the feature contract.
+        Raises ModelValidationError, returns the parity report otherwise.
+        """
+        model = loaded.model
+        if not hasattr(model, "predict_proba"):
+            raise ModelValidationError(f"{loaded.version} has no predict_proba")
+
+        num_features = getattr(model, "n_features_in_", NUM_FEATURES)
+        if num_features != NUM_FEATURES:
+            raise ModelValidationError(
+                f"{loaded.version} expects {num_features} features, not {NUM_FEATURES}"
+            )
+
+        if len(loaded.engine.classes) != 2:
+            raise ModelValidationError(f"{loaded.version} is not a binary classifier")
+
+        # requests are encoded with the serving vocabulary, so a model trained on
+        # another one would read every one-hot column at the wrong position
+        if loaded.encoder is not None and loaded.encoder != SERVING_ENCODER:
+            raise ModelValidationError(
+                f"{loaded.version} was trained with encoder {loaded.encoder.version}, "
+                f"not the serving encoder {SERVING_ENCODER.version}"
+            )
+
+        # the engine must agree with sklearn on real rows before it serves traffic
+        if self._parity_matrix is None:
+            if not PARITY_DATA_PATH.exists():
+                model_loader_logger.warning(
+                    "parity_check_skipped", parity_data_path=str(PARITY_DATA_PATH)
+                )
+                return {}
+            self._parity_matrix = load_parity_matrix()
+
+        report = check_parity(loaded.engine, self._parity_matrix)
+        if report["max_abs_diff"] > RELOAD_PARITY_ATOL or report["label_mismatches"]:
+            raise ModelValidationError(f"{loaded.version} failed the parity check: {report}")
+        return report
+
+    def reload(self, path: Optional[Path] = None) -> LoadedModel:
+        """
+        Load, validate and warm up an artifact, then swap it in.
+
+        Defaults to reloading the served path. The served model stays in
+        place if any step fails.
+        """
+        path = Path(path) if path else self.path
+
+        with self._reload_lock:
+            previous = self._current
+            start_ns = time.perf_counter_ns()
+
+            candidate = self._load_artifact(path)
+            try:
+                parity = self.validate(candidate)
+            except ModelValidationError as e:
+                model_loader_logger.error("model_rejected", model_path=str(path), error=str(e))
+                raise
+            warm_up_engine(candidate.engine)
+
+            self._swap(candidate)
+            self._warm.set()
+
+        model_loader_logger.info(
+            "model_swapped",
+            model_version=candidate.version,
+            previous_version=previous.version if previous else None,
+            reload_ms=round((time.perf_counter_ns() - start_ns) / 1_000_000, 4),
+            parity_max_abs_diff=parity.get("max_abs_diff"),
+        )
+        return candidate
+
+    @property
+    def current(self) -> LoadedModel:
+        """
+        The served model. Raises ModelNotLoadedError before load().
+        """
+        if self._current is None:
+            raise ModelNotLoadedError("Model has not been loaded yet")
+        return self._current
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._current is not None
+
+    @property
+    def is_ready(self) -> bool:
+        return self._current is not None and self._warm.is_set()
+
+    def warm_up(self, num_rows: int = 256) -> None:
+        """
+        Run dummy inference on the served model, then mark it ready.
+        """
+        start_ns = time.perf_counter_ns()
+        warm_up_engine(self.current.engine, num_rows)
+
+        self._warm.set()
+        model_loader_logger.info(
+            "model_warmed_up",
+            warmup_ms=round((time.perf_counter_ns() - start_ns) / 1_000_000, 4),
+        )
+
+    def mark_ready(self) -> None:
+        """
+        Mark the loaded model ready without warming it up.
+        """
+        self._warm.set()
+
+
+class ModelWatcher:
+    """
+    Polls the models directory and hot reloads the registry.
+
+    The served artifact is reloaded when it is rewritten in place. With
+    auto_promote, a served churn_model_v<N>.joblib also moves to any newer
+    version; without it (the default) new versions are promoted explicitly,
+    so training runs and challengers never replace the champion on their own.
+    Artifacts should be published with os.replace so the watcher never sees a
+    partial file; a rejected artifact is retried once the file changes again.
+    """
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        models_dir: Path = MODELS_DIR,
+        interval_s: float = MODEL_WATCH_INTERVAL_S,
+        auto_promote: bool = MODEL_AUTO_PROMOTE,
+    ):
+        self.registry = registry
+        self.models_dir = Path(models_dir)
+        self.interval_s = interval_s
+        self.auto_promote = auto_promote
+        # (mtime, size) of every artifact already loaded or rejected
+        self._seen: dict[Path, tuple] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _fingerprint(path: Path) -> Optional[tuple]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _candidate(self) -> Path:
+        served = self.registry.path
+        if not self.auto_promote:
+            return served
+        served_version = _version_number(served)
+        latest = latest_model_path(self.models_dir)
+
+        # only a versioned artifact is upgraded to a newer version
+        if served_version is not None and latest is not None:
+            if _version_number(latest) > served_version:
+                return latest
+        return served
+
+    def check(self) -> Optional[LoadedModel]:
+        """
+        Reload if the candidate artifact changed since it was last seen.
+        """
+        path = self._candidate()
+        fingerprint = self._fingerprint(path)
+        if fingerprint is None or self._seen.get(path) == fingerprint:
+            return None
+        self._seen[path] = fingerprint
+
+        try:
+            return self.registry.reload(path)
+        except Exception as e:
+            model_loader_logger.error("model_reload_failed", model_path=str(path), error=str(e))
+            return None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self.check()
+
+    def start(self) -> None:
+        if self.interval_s <= 0 or self._thread is not None:
+            return
+        # the artifact loaded at startup is the baseline
+        self._seen[self.registry.path] = self._fingerprint(self.registry.path)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+
+# registry used by the API, loaded by the API lifespan
+registry = ModelRegistry()
+model_watcher = ModelWatcher(registry)
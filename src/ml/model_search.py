@@ -0,0 +1,288 @@
+"""
+model_search.py
+
+Owns:
+- Comparing estimators and hyperparameters with cross-validation on all cores
+- The leaderboard: ROC-AUC, fit time and serving latency of every candidate
+- Picking the winner on accuracy and latency together, and exporting it
+
+Does NOT:
+- Parse or encode the training data (see dataset.py)
+- Serve or hot reload models (a running API picks up the export on its own)
+- Know about FastAPI
+
+Usage:
+    python -m src.ml.model_search [--grid grid.json] [--folds 5] [--n-jobs -1]
+                                  [--auc-tolerance 0.005] [--max-latency-us N] [--no-export]
+
+A grid file is a JSON list of {"estimator": <name in ESTIMATORS>, "params": {...}},
+where every list-valued param is searched over.
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import ParameterGrid, StratifiedKFold, train_test_split
+
+from src.ml.dataset import DATASET_CACHE_DIR, PROJECT_ROOT, TRAINING_DATA_PATH, load_training_data
+from src.ml.features import FEATURES
+from src.ml.inference import InferenceEngine
+from src.ml.load_model import MODELS_DIR, next_version_path
+from src.ml.train_model import save_artifact
+
+LEADERBOARD_PATH = PROJECT_ROOT / "reports" / "leaderboard.json"
+
+ESTIMATORS = {
+    "logistic_regression": LogisticRegression,
+    "random_forest": RandomForestClassifier,
+    "hist_gradient_boosting": HistGradientBoostingClassifier,
+}
+
+# the notebooks' baseline and comparison models, with their main knobs
+DEFAULT_GRID = [
+    {
+        "estimator": "logistic_regression",
+        "params": {"C": [0.1, 1.0, 10.0], "class_weight": [None, "balanced"], "max_iter": [1000]},
+    },
+    {
+        "estimator": "random_forest",
+        "params": {"n_estimators": [100, 300], "max_depth": [None, 10], "class_weight": ["balanced"]},
+    },
+    {
+        "estimator": "hist_gradient_boosting",
+        "params": {"learning_rate": [0.05, 0.1], "max_depth": [None, 6]},
+    },
+]
+
+# candidates within this CV ROC-AUC of the best compete on latency
+DEFAULT_AUC_TOLERANCE = 0.005
+
+# latency is measured on 1k-row batches through the serving InferenceEngine
+LATENCY_ROWS = 1000
+LATENCY_REPEATS = 50
+
+
+def expand_grid(grid: list[dict], random_state: int) -> list[dict]:
+    """
+    One candidate per estimator and parameter combination.
+    """
+    candidates = []
+    for entry in grid:
+        estimator_cls = ESTIMATORS[entry["estimator"]]
+        param_grid = {
+            key: value if isinstance(value, list) else [value]
+            for key, value in entry.get("params", {}).items()
+        }
+        for params in ParameterGrid(param_grid):
+            estimator = estimator_cls(**params)
+            if "random_state" in estimator.get_params():
+                estimator.set_params(random_state=random_state)
+            label = ", ".join(f"{key}={value}" for key, value in sorted(params.items()))
+            candidates.append({
+                "name": f"{entry['estimator']}({label})",
+                "estimator": entry["estimator"],
+                "params": params,
+                "model": estimator,
+            })
+    return candidates
+
+
+def _fit_and_score(estimator, X: np.ndarray, y: np.ndarray, train_idx, test_idx) -> tuple[float, float]:
+    # one (candidate, fold) task; X is the shared memory-mapped matrix
+    model = clone(estimator)
+    start = time.perf_counter()
+    model.fit(X[train_idx], y[train_idx])
+    fit_time = time.perf_counter() - start
+    return fit_time, roc_auc_score(y[test_idx], model.predict_proba(X[test_idx])[:, 1])
+
+
+def _fit(estimator, X: np.ndarray, y: np.ndarray):
+    return clone(estimator).fit(X, y)
+
+
+def measure_latency_us(model, X: np.ndarray, repeats: int = LATENCY_REPEATS) -> float:
+    """
+    Median microseconds to score LATENCY_ROWS rows the way the API does.
+    """
+    engine = InferenceEngine(model)
+    batch = np.ascontiguousarray(np.resize(X, (LATENCY_ROWS, X.shape[1])), dtype=np.float64)
+    engine.predict(batch)
+
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        engine.predict(batch)
+        samples.append(time.perf_counter_ns() - start)
+    return float(np.median(samples)) / 1000
+
+
+def select_winner(
+    rows: list[dict],
+    auc_tolerance: float = DEFAULT_AUC_TOLERANCE,
+    max_latency_us: Optional[float] = None,
+) -> Optional[dict]:
+    """
+    Rank the leaderboard in place and return the winner.
+
+    Candidates over the latency budget are ineligible. Among the rest, those
+    within auc_tolerance of the best CV ROC-AUC are ranked by latency, then
+    everyone else by ROC-AUC, so a slightly less accurate but much faster
+    model wins over a marginally better slow one.
+    """
+    for row in rows:
+        row["eligible"] = max_latency_us is None or row["latency_us_per_1k"] <= max_latency_us
+
+    eligible = [row for row in rows if row["eligible"]]
+    best_auc = max((row["cv_roc_auc"] for row in eligible), default=None)
+    for row in rows:
+        row["within_tolerance"] = (
+            row["eligible"] and row["cv_roc_auc"] >= best_auc - auc_tolerance
+        )
+
+    rows.sort(key=lambda row: (
+        not row["eligible"],
+        not row["within_tolerance"],
+        row["latency_us_per_1k"] if row["within_tolerance"] else -row["cv_roc_auc"],
+    ))
+    for rank, row in enumerate(rows, start=1):
+        row["rank"] = rank
+    return rows[0] if rows and rows[0]["eligible"] else None
+
+
+def run_search(
+    X: np.ndarray,
+    y: np.ndarray,
+    grid: list[dict],
+    folds: int = 5,
+    n_jobs: int = -1,
+    test_size: float = 0.2,
+    random_state: int = 42,
+) -> tuple[list[dict], dict]:
+    """
+    Cross-validate every candidate, then fit each on the whole training split
+    and score it on the holdout. Returns the leaderboard rows and the fitted
+    models by name.
+    """
+    candidates = expand_grid(grid, random_state)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=random_state, stratify=y
+    )
+    splits = list(StratifiedKFold(folds, shuffle=True, random_state=random_state).split(X_train, y_train))
+
+    # every (candidate, fold) pair is one task, so all cores stay busy across the whole grid
+    parallel = Parallel(n_jobs=n_jobs)
+    scores = parallel(
+        delayed(_fit_and_score)(candidate["model"], X_train, y_train, train_idx, test_idx)
+        for candidate in candidates
+        for train_idx, test_idx in splits
+    )
+    models = parallel(delayed(_fit)(candidate["model"], X_train, y_train) for candidate in candidates)
+
+    rows, fitted = [], {}
+    for i, (candidate, model) in enumerate(zip(candidates, models)):
+        fit_times, aucs = np.array(scores[i * folds:(i + 1) * folds]).T
+        model.custom_name = candidate["name"]
+        fitted[candidate["name"]] = model
+        rows.append({
+            "name": candidate["name"],
+            "estimator": candidate["estimator"],
+            "params": candidate["params"],
+            "cv_roc_auc": round(float(aucs.mean()), 5),
+            "cv_roc_auc_std": round(float(aucs.std()), 5),
+            "holdout_roc_auc": round(float(roc_auc_score(y_test, model.predict_proba(X_test)[:, 1])), 5),
+            "fit_time_s": round(float(fit_times.mean()), 4),
+            # measured one candidate at a time, after the parallel work, so cores are not contended
+            "latency_us_per_1k": round(measure_latency_us(model, X_test), 2),
+            "fast_path": InferenceEngine(model).is_fast_path,
+        })
+    return rows, fitted
+
+
+def print_leaderboard(rows: list[dict]) -> None:
+    print(f"{'rank':>4} {'candidate':<72} {'cv_auc':>8} {'holdout':>8} {'fit_s':>8} {'us/1k':>10}")
+    for row in rows:
+        flag = "" if row["eligible"] else "  over latency budget"
+        print(
+            f"{row['rank']:>4} {row['name']:<72} {row['cv_roc_auc']:>8.4f} {row['holdout_roc_auc']:>8.4f} "
+            f"{row['fit_time_s']:>8.3f} {row['latency_us_per_1k']:>10.1f}{flag}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Cross-validate a grid of churn models and export the best as the next versioned artifact."
+    )
+    parser.add_argument("--data", type=Path, default=TRAINING_DATA_PATH)
+    parser.add_argument("--grid", type=Path, help="JSON grid file (default: DEFAULT_GRID).")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Parallel fits, -1 for all cores.")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--random-state", type=int, default=42)
+    parser.add_argument(
+        "--auc-tolerance",
+        type=float,
+        default=DEFAULT_AUC_TOLERANCE,
+        help="Candidates within this CV ROC-AUC of the best are ranked by latency.",
+    )
+    parser.add_argument("--max-latency-us", type=float, help="Latency budget per 1k rows.")
+    parser.add_argument("--leaderboard", type=Path, default=LEADERBOARD_PATH)
+    parser.add_argument("--cache-dir", type=Path, default=DATASET_CACHE_DIR)
+    parser.add_argument("--no-export", action="store_true", help="Only write the leaderboard.")
+    args = parser.parse_args()
+
+    grid = json.loads(args.grid.read_text()) if args.grid else DEFAULT_GRID
+    unknown = {entry["estimator"] for entry in grid} - ESTIMATORS.keys()
+    if unknown:
+        parser.error(f"unknown estimators {sorted(unknown)}, expected one of {sorted(ESTIMATORS)}")
+
+    data = load_training_data(args.data, cache_dir=args.cache_dir)
+    if data.encoder.feature_names != FEATURES:
+        parser.error(f"{args.data} does not encode into the FEATURES contract")
+
+    start = time.perf_counter()
+    rows, fitted = run_search(
+        data.X, data.y, grid, args.folds, args.n_jobs, args.test_size, args.random_state
+    )
+    winner = select_winner(rows, args.auc_tolerance, args.max_latency_us)
+    print_leaderboard(rows)
+    print(f"\n{len(rows)} candidates x {args.folds} folds in {time.perf_counter() - start:.1f}s")
+
+    export_path = None
+    if winner is None:
+        print("No candidate meets the latency budget, nothing exported.")
+    elif not args.no_export:
+        export_path = next_version_path(MODELS_DIR)
+        save_artifact(fitted[winner["name"]], data.encoder, export_path)
+        print(f"Winner {winner['name']} exported to {export_path}")
+    else:
+        print(f"Winner {winner['name']}")
+
+    args.leaderboard.parent.mkdir(parents=True, exist_ok=True)
+    args.leaderboard.write_text(json.dumps({
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "data": str(args.data),
+        "dataset_key": data.key,
+        "folds": args.folds,
+        "test_size": args.test_size,
+        "random_state": args.random_state,
+        "auc_tolerance": args.auc_tolerance,
+        "max_latency_us": args.max_latency_us,
+        "winner": winner["name"] if winner else None,
+        "exported_to": str(export_path) if export_path else None,
+        "candidates": rows,
+    }, indent=2) + "\n")
+    print(f"Leaderboard written to {args.leaderboard}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,31 +4,52 @@ preprocessing.py
 Owns:
 - Numeric scaling
 - Categorical encoding
+- The blank TotalCharges rule shared by training, offline and bulk scoring
 
 Does NOT:
 - Load models
 - Perform predictions
 - Know about FastAPI
 - Have the mapping function for ChurnInput
+- Fix a vocabulary (see encoder.py; the dummies here depend on the frame given)
 """
 
 import pandas as pd
 
+# ml/notebooks/02_data_cleaning.ipynb: TotalCharges is blank for customers in their
+# first month, such rows are dropped from training and cannot be scored
+MISSING_TOTAL_CHARGES_ERROR = (
+    "TotalCharges is blank or not numeric; rows without TotalCharges are not scored"
+)
+
+
+def is_missing_total_charges(value) -> bool:
+    # same outcome as pd.to_numeric(errors="coerce") followed by dropna, for one value
+    if value is None:
+        return True
+    try:
+        return pd.isna(float(value))
+    except (TypeError, ValueError):
+        return True
+
+
+def drop_missing_total_charges(df):
+    # coerces TotalCharges to numbers and drops the rows where it is missing
+    df = df.copy()
+    df["TotalCharges"] = pd.to_numeric(df["TotalCharges"], errors="coerce")
+    return df.dropna(subset=["TotalCharges"])
+
+
 # processes the cleaned csv file to be used for model input
 def process_data(df):
-    categorical_cols = df.select_dtypes(include='object').columns 
+    categorical_cols = df.select_dtypes(exclude='number').columns
+
+    # one dummy frame per categorical column, named "<category> (<column>)"
+    encoded = []
     for c in categorical_cols:
-    
-        # encoding
         hot_encoded_c = pd.get_dummies(df[c])
-        new_categories = hot_encoded_c.columns
-    
-        # new categories for df
-        new_categories_distinct = [ f"{new_c} ({c})" for new_c in new_categories]
-        hot_encoded_c.columns = new_categories_distinct
-    
-        # creating the new categories
-        df[new_categories_distinct] = hot_encoded_c
-        df = df.drop(columns=[c])
-
-    return df
\ No newline at end of file
+        hot_encoded_c.columns = [f"{new_c} ({c})" for new_c in hot_encoded_c.columns]
+        encoded.append(hot_encoded_c)
+
+    # a single concat instead of inserting columns one by one, which fragments the frame
+    return pd.concat([df.drop(columns=categorical_cols), *encoded], axis=1)
@@ -3,40 +3,98 @@ train_model.py
 
 Owns:
 - Training the churn model
-- Saving the churn model
+- Saving the churn model and its encoder
 
 Does NOT:
 - Load models
 - Perform predictions
 - Know about FastAPI
-- Have one-hot encoding implementation
+- Have one-hot encoding implementation (see encoder.py)
+- Parse or cache the training data (see dataset.py)
+
+Usage:
+    python -m src.ml.train_model [--data CSV] [--output ARTIFACT] [--C 1.0] [--no-cache]
 """
 
-import pandas as pd
+import argparse
+import os
+import time
+from pathlib import Path
+
+import joblib
 from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import roc_auc_score
 from sklearn.model_selection import train_test_split
-from preprocessing import process_data
-import joblib
-from pathlib import Path
 
-# Full path to the current script
-print(f"Full script path: {Path(__file__).resolve()}")
+from src.ml.dataset import DATASET_CACHE_DIR, TRAINING_DATA_PATH, load_training_data
+from src.ml.encoder import encoder_path_for
+from src.ml.features import FEATURES
+from src.ml.load_model import MODELS_DIR, next_version_path
+
+
+def save_artifact(model, encoder, output: Path) -> None:
+    """
+    Publish the model and its encoder under output.
+
+    The encoder is written first and the model renamed into place last, so the
+    model watcher never picks up an artifact without its encoder.
+    """
+    encoder.save(encoder_path_for(output))
+    tmp_path = output.with_name(output.name + ".tmp")
+    joblib.dump(model, tmp_path)
+    os.replace(tmp_path, output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train the churn model on the processed dataset.")
+    parser.add_argument("--data", type=Path, default=TRAINING_DATA_PATH)
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="Artifact to write (default: the next churn_model_v<N>.joblib in src/models).",
+    )
+    parser.add_argument("--C", type=float, default=1.0, help="Inverse regularization strength.")
+    parser.add_argument("--max-iter", type=int, default=100)
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--random-state", type=int, default=42)
+    parser.add_argument("--cache-dir", type=Path, default=DATASET_CACHE_DIR)
+    parser.add_argument("--no-cache", action="store_true", help="Parse and encode the CSV without the dataset cache.")
+    parser.add_argument("--rebuild-cache", action="store_true", help="Re-encode the CSV and overwrite its cache entry.")
+    args = parser.parse_args()
+
+    # load data, from the dataset cache unless the CSV changed
+    start = time.perf_counter()
+    data = load_training_data(
+        args.data,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        rebuild=args.rebuild_cache,
+    )
+    print(
+        f"Loaded {data.X.shape[0]} rows ({'cache hit' if data.cached else 'encoded'}, "
+        f"key {data.key}) in {time.perf_counter() - start:.3f}s"
+    )
+
+    # the API encodes requests in FEATURES order, a model trained on any other is unusable
+    if data.encoder.feature_names != FEATURES:
+        parser.error(f"{args.data} does not encode into the FEATURES contract")
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        data.X, data.y, test_size=args.test_size, random_state=args.random_state
+    )
 
-# load data
-df = pd.read_csv('./data/processed/telco_churn_clean.csv')
+    # training the model
+    model = LogisticRegression(class_weight='balanced', C=args.C, max_iter=args.max_iter)
+    model.custom_name = "logistic_regression_class_weights"
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    print(f"Trained in {time.perf_counter() - start:.3f}s")
+    print(f"Test ROC-AUC: {roc_auc_score(y_test, model.predict_proba(X_test)[:, 1]):.4f}")
 
-# appylying preprocessing for model
-df = process_data(df)
-X = df.drop('Churn', axis=1)
-y = df['Churn']
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    # save trained model
+    output = args.output or next_version_path(MODELS_DIR)
+    save_artifact(model, data.encoder, output)
+    print(f"The churn model was saved successfully to {output}.")
 
-# training the model
-model = LogisticRegression(class_weight='balanced')
-model.custom_name = "logistic_regression_class_weights"
-model.fit(X_train, y_train)
 
-# save trained model
-MODEL_PATH = "./src/models/churn_model_v1.joblib"
-joblib.dump(model, MODEL_PATH)
-print("The churn model was saved successfully.")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+"""
+score_db.py
+
+Owns:
+- Offline batch scoring of the telco_churn.db customers table (score-db)
+- Writing scores to the customer_scores table, one transaction per chunk
+- Resuming an interrupted run from its completed chunks
+
+Does Not:
+- Load the customers table (see sql/load_csv_to_sql.py)
+- Train models
+- Routing
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.api.logging_config import get_logger
+from src.api.validators import find_exclusivity_violations
+from src.ml.features import SERVING_ENCODER
+from src.ml.load_model import MODEL_PATH, ModelRegistry
+from src.ml.preprocessing import drop_missing_total_charges
+
+logger = get_logger(__name__)
+
+# Resolve project root safely (…/src/sql/score_db.py → project root)
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+CUSTOMERS_DB_PATH = PROJECT_ROOT / "sql" / "telco_churn.db"
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# model loaded once per worker process by _init_worker
+_worker_registry: Optional[ModelRegistry] = None
+
+
+def _connect(db_path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _initialize_tables(conn: sqlite3.Connection) -> None:
+    with conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS customer_scores (
+                customer_id TEXT PRIMARY KEY,
+                churn_probability REAL NOT NULL,
+                churn_label INTEGER NOT NULL,
+                model_version TEXT NOT NULL,
+                scored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS customer_score_chunks (
+                first_rowid INTEGER NOT NULL,
+                last_rowid INTEGER NOT NULL,
+                model_version TEXT NOT NULL,
+                num_rows INTEGER NOT NULL,
+                completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (first_rowid, last_rowid, model_version)
+            )
+            """
+        )
+
+
+def plan_chunks(conn: sqlite3.Connection, chunk_size: int) -> Iterator[tuple[int, int]]:
+    """
+    Yield (first_rowid, last_rowid) ranges of at most chunk_size customers,
+    found by keyset pagination on rowid so no query scans skipped rows.
+    """
+    last_rowid = 0
+    while True:
+        rows = conn.execute(
+            "SELECT rowid FROM customers WHERE rowid > ? ORDER BY rowid LIMIT ?",
+            (last_rowid, chunk_size),
+        ).fetchall()
+        if not rows:
+            return
+        yield rows[0][0], rows[-1][0]
+        last_rowid = rows[-1][0]
+
+
+def encode_customers(df: pd.DataFrame):
+    """
+    Clean a chunk of raw customers and encode it in FEATURES order.
+
+    Mirrors ml/notebooks/02_data_cleaning.ipynb: rows without a numeric
+    TotalCharges cannot be scored and are dropped. So are rows with a category
+    outside the encoder's vocabulary, which encode as an all-zero one-hot group.
+    """
+    df = drop_missing_total_charges(df)
+
+    customer_ids = df["customerID"].tolist()
+    # the encoder's vocabulary is fixed, so a chunk missing some categories still
+    # encodes into every FEATURES column; customerID and Churn are ignored
+    X = SERVING_ENCODER.transform(df)
+
+    violations = find_exclusivity_violations(X)
+    if violations:
+        logger.warning(
+            "score_db_rows_skipped",
+            reason="unknown_category",
+            customer_ids=[customer_ids[row] for row in violations],
+            groups=sorted({group for groups in violations.values() for group in groups}),
+        )
+        keep = np.ones(len(X), dtype=bool)
+        keep[list(violations)] = False
+        customer_ids = [customer_id for customer_id, kept in zip(customer_ids, keep) if kept]
+        X = X[keep]
+    return customer_ids, X
+
+
+def _init_worker(model_path: Path) -> None:
+    global _worker_registry
+    _worker_registry = ModelRegistry(model_path)
+    _worker_registry.load()
+
+
+def score_chunk(db_path: Path, first_rowid: int, last_rowid: int) -> dict:
+    # runs in a worker process with its own read connection
+    start = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    try:
+        df = pd.read_sql(
+            "SELECT * FROM customers WHERE rowid BETWEEN ? AND ? ORDER BY rowid",
+            conn,
+            params=(first_rowid, last_rowid),
+        )
+    finally:
+        conn.close()
+
+    customer_ids, X = encode_customers(df)
+    served = _worker_registry.current
+    probas, labels = served.engine.predict(X) if len(X) else ([], [])
+
+    return {
+        "first_rowid": first_rowid,
+        "last_rowid": last_rowid,
+        "num_read": len(df),
+        "model_version": served.version,
+        "scores": list(zip(customer_ids, map(float, probas), map(int, labels))),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def _write_chunk(conn: sqlite3.Connection, result: dict) -> None:
+    # scores and the chunk's completion marker commit together
+    with conn:
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO customer_scores (
+                customer_id,
+                churn_probability,
+                churn_label,
+                model_version
+            )
+            VALUES (?, ?, ?, ?)
+            """,
+            [(*score, result["model_version"]) for score in result["scores"]],
+        )
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO customer_score_chunks (
+                first_rowid,
+                last_rowid,
+                model_version,
+                num_rows
+            )
+            VALUES (?, ?, ?, ?)
+            """,
+            (
+                result["first_rowid"],
+                result["last_rowid"],
+                result["model_version"],
+                len(result["scores"]),
+            ),
+        )
+
+
+def _completed_chunks(conn: sqlite3.Connection, model_version: str) -> set:
+    rows = conn.execute(
+        "SELECT first_rowid, last_rowid FROM customer_score_chunks WHERE model_version = ?",
+        (model_version,),
+    ).fetchall()
+    return set(rows)
+
+
+def run_chunks(
+    db_path: Path,
+    chunks: list[tuple[int, int]],
+    workers: int,
+    model_path: Path,
+    on_result=None,
+) -> tuple[int, float]:
+    """
+    Score chunks across a process pool; returns (rows scored, seconds).
+
+    At most two chunks per worker are in flight, so memory stays bounded
+    however large the table is.
+    """
+    num_rows = 0
+    start = time.perf_counter()
+    pending_chunks = iter(chunks)
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(model_path,)
+    ) as pool:
+        in_flight = set()
+        while True:
+            while len(in_flight) < workers * 2:
+                chunk = next(pending_chunks, None)
+                if chunk is None:
+                    break
+                in_flight.add(pool.submit(score_chunk, db_path, *chunk))
+            if not in_flight:
+                break
+
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                num_rows += len(result["scores"])
+                if on_result is not None:
+                    on_result(result)
+
+    return num_rows, time.perf_counter() - start
+
+
+def score_db(
+    db_path: Path = CUSTOMERS_DB_PATH,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = 1,
+    model_path: Path = MODEL_PATH,
+    restart: bool = False,
+) -> None:
+    """
+    Score every customer into customer_scores, skipping chunks a previous
+    run with the same model version already completed.
+    """
+    conn = _connect(db_path)
+    _initialize_tables(conn)
+    model_version = ModelRegistry(model_path).load().version
+
+    if restart:
+        with conn:
+            conn.execute(
+                "DELETE FROM customer_score_chunks WHERE model_version = ?",
+                (model_version,),
+            )
+
+    completed = _completed_chunks(conn, model_version)
+    chunks = [c for c in plan_chunks(conn, chunk_size) if c not in completed]
+    logger.info(
+        "score_db_started",
+        db_path=str(db_path),
+        workers=workers,
+        chunk_size=chunk_size,
+        chunks_pending=len(chunks),
+        chunks_skipped=len(completed),
+    )
+
+    def write(result: dict) -> None:
+        _write_chunk(conn, result)
+        logger.info(
+            "score_db_chunk_completed",
+            first_rowid=result["first_rowid"],
+            last_rowid=result["last_rowid"],
+            num_rows=len(result["scores"]),
+            num_skipped=result["num_read"] - len(result["scores"]),
+            rows_per_sec=round(len(result["scores"]) / result["seconds"], 1),
+        )
+
+    num_rows, seconds = run_chunks(db_path, chunks, workers, model_path, on_result=write)
+    conn.close()
+
+    logger.info(
+        "score_db_completed",
+        num_rows=num_rows,
+        seconds=round(seconds, 3),
+        rows_per_sec=round(num_rows / seconds, 1) if seconds > 0 else None,
+    )
+
+
+def benchmark(
+    db_path: Path = CUSTOMERS_DB_PATH,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_workers: int = os.cpu_count() or 1,
+    model_path: Path = MODEL_PATH,
+) -> list[dict]:
+    """
+    Score the whole table without writing, for 1..max_workers workers, and
+    report throughput and scaling efficiency relative to one worker.
+    """
+    conn = _connect(db_path)
+    chunks = list(plan_chunks(conn, chunk_size))
+    conn.close()
+
+    report = []
+    for workers in range(1, max_workers + 1):
+        num_rows, seconds = run_chunks(db_path, chunks, workers, model_path)
+        rows_per_sec = num_rows / seconds
+        baseline = report[0]["rows_per_sec"] if report else rows_per_sec
+        report.append({
+            "workers": workers,
+            "rows_per_sec": round(rows_per_sec, 1),
+            "scaling_efficiency": round(rows_per_sec / (baseline * workers), 3),
+        })
+        print(report[-1])
+
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="score-db",
+        description="Score the customers table of telco_churn.db into customer_scores.",
+    )
+    parser.add_argument("--db", type=Path, default=CUSTOMERS_DB_PATH)
+    parser.add_argument("--model", type=Path, default=MODEL_PATH)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore chunks completed by a previous run of the same model.",
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Report rows/sec and scaling efficiency for 1..--workers workers, without writing.",
+    )
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.db, args.chunk_size, args.workers, args.model)
+    else:
+        score_db(args.db, args.chunk_size, args.workers, args.model, args.restart)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ sqlite.py
 
 Owns:
 - Initialization of the churn SQL database
+- The shared write-behind writer used by the API
 
 Does Not: 
 - Logging configurations
@@ -11,13 +12,25 @@ Does Not:
 - Load or train models
 """
 
+from functools import lru_cache
+
 from src.api.persistence import PredictionStore
+from src.api.write_behind import WriteBehindWriter
 from src.api.logging_config import get_logger
 
 # initializing logger
 db_logger = get_logger(__name__)
 
-# intialilizing churn database 
-db = PredictionStore()
-db_logger.info("database_connected")    
 
+# intialilizing churn database on first use, importing this module has no side effects
+@lru_cache(maxsize=None)
+def get_db() -> PredictionStore:
+    db = PredictionStore()
+    db_logger.info("database_connected")
+    return db
+
+
+# predictions are written through a background writer, started by the API lifespan
+@lru_cache(maxsize=None)
+def get_writer() -> WriteBehindWriter:
+    return WriteBehindWriter(get_db())